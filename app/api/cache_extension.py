@@ -0,0 +1,170 @@
+"""
+This module is used to cache per user responses, i.e. the dashboard and the
+home statistics, which are rebuilt from several queries and polled often.
+
+Entries are kept for USER_CACHE_TTL seconds and dropped as soon as a commit
+touches a mentorship relation, a tasks list or a user involved with them
+(see app/database/cache_invalidation.py). Invalidating a user also changes
+its generation, so a response built from the data read before the commit
+isn't cached after the invalidation. The backend is chosen with the
+USER_CACHE_BACKEND config value:
+- "memory": per process LRU dictionary, bounded by USER_CACHE_MAX_ENTRIES;
+  the entries are only dropped in the process making the change, so it is
+  meant for single process deployments
+- "redis": shared by all the workers, at USER_CACHE_REDIS_URL; LRU eviction
+  is left to the server maxmemory-policy
+- "null": nothing is cached, the default
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+
+class NullCacheBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete_many(self, keys):
+        pass
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class RedisCacheBackend:
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "USER_CACHE_BACKEND 'redis' requires the redis package to be installed"
+            )
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, json.dumps(value), ex=int(ttl))
+
+    def delete_many(self, keys):
+        if keys:
+            self._client.delete(*keys)
+
+
+class UserCache:
+
+    KEY_PREFIX = "user_cache"
+
+    def __init__(self):
+        self.backend = NullCacheBackend()
+        self.ttl = 0
+        self.namespaces = set()
+
+    def init_app(self, app):
+        backend_name = app.config["USER_CACHE_BACKEND"]
+        if backend_name == "memory":
+            self.backend = MemoryCacheBackend(app.config["USER_CACHE_MAX_ENTRIES"])
+        elif backend_name == "redis":
+            self.backend = RedisCacheBackend(app.config["USER_CACHE_REDIS_URL"])
+        elif backend_name == "null":
+            self.backend = NullCacheBackend()
+        else:
+            raise ValueError(
+                "USER_CACHE_BACKEND has to be within these values: memory, redis, null."
+            )
+        self.ttl = app.config["USER_CACHE_TTL"]
+
+        app.extensions["user_cache"] = self
+
+    def key(self, namespace, user_id):
+        return f"{self.KEY_PREFIX}:{namespace}:{user_id}"
+
+    def generation_key(self, user_id):
+        return f"{self.KEY_PREFIX}:generation:{user_id}"
+
+    def cached(self, namespace):
+        """
+        Caches the result of a function taking the user id as its first
+        argument, or as the user_id keyword argument. Empty results aren't cached.
+        """
+        self.namespaces.add(namespace)
+
+        def decorator(user_function):
+            @wraps(user_function)
+            def get_or_build(*args, **kwargs):
+                user_id = kwargs["user_id"] if "user_id" in kwargs else args[0]
+                key = self.key(namespace, user_id)
+
+                value = self.backend.get(key)
+                if value is None:
+                    generation_key = self.generation_key(user_id)
+                    generation = self.backend.get(generation_key)
+                    value = user_function(*args, **kwargs)
+                    if value and self.backend.get(generation_key) == generation:
+                        self.backend.set(key, value, self.ttl)
+                        # invalidated between the check and the set
+                        if self.backend.get(generation_key) != generation:
+                            self.backend.delete_many([key])
+
+                return value
+
+            return get_or_build
+
+        return decorator
+
+    def invalidate_users(self, user_ids):
+        # the generations change before the entries are dropped, a response
+        # cached in between is dropped by its builder or by delete_many
+        for user_id in user_ids:
+            self.backend.set(self.generation_key(user_id), uuid.uuid4().hex, self.ttl)
+        self.backend.delete_many(
+            [
+                self.key(namespace, user_id)
+                for user_id in user_ids
+                for namespace in self.namespaces
+            ]
+        )
+
+
+cache = UserCache()
@@ -0,0 +1,79 @@
+"""
+This module is used to sign and verify the email confirmation tokens.
+
+The serializers are built once, when the app is created, and the signing keys
+derived from the secrets are cached, so confirming an email only checks the
+signature. Tokens are signed with SECRET_KEY and still accepted when they
+were signed with one of OLD_SECRET_KEYS, which allows rotating the secret
+without invalidating the confirmation links already sent.
+"""
+from itsdangerous import (
+    BadSignature,
+    SignatureExpired,
+    TimestampSigner,
+    URLSafeTimedSerializer,
+)
+
+
+class KeyCachingTimestampSigner(TimestampSigner):
+    """A TimestampSigner which derives the key of each secret only once."""
+
+    _derived_keys = {}
+
+    def derive_key(self, *secret_key):
+        # itsdangerous 1.x derives the key of self.secret_key while 2.x may
+        # pass the secret to verify a signature with
+        cache_key = (
+            secret_key[0] if secret_key else self.secret_key,
+            self.salt,
+            self.key_derivation,
+            self.digest_method,
+        )
+        derived_key = self._derived_keys.get(cache_key)
+        if derived_key is None:
+            derived_key = super().derive_key(*secret_key)
+            self._derived_keys[cache_key] = derived_key
+
+        return derived_key
+
+
+class ConfirmationTokens:
+    def __init__(self, secret_key, old_secret_keys=(), salt=None):
+        self.serializer = self._build_serializer(secret_key, salt)
+        # only tried when the token isn't signed with the current secret
+        self.old_serializers = [
+            self._build_serializer(old_secret_key, salt)
+            for old_secret_key in old_secret_keys
+        ]
+
+    @staticmethod
+    def _build_serializer(secret_key, salt):
+        return URLSafeTimedSerializer(
+            secret_key, salt=salt, signer=KeyCachingTimestampSigner
+        )
+
+    @classmethod
+    def init_app(cls, app):
+        confirmation_tokens = cls(
+            app.config["SECRET_KEY"],
+            app.config["OLD_SECRET_KEYS"],
+            app.config["SECURITY_PASSWORD_SALT"],
+        )
+        app.extensions["confirmation_tokens"] = confirmation_tokens
+        return confirmation_tokens
+
+    def generate(self, email: str) -> str:
+        return self.serializer.dumps(email)
+
+    def confirm(self, token: str, expiration: int):
+        """Returns the email signed into the token, or False if it isn't valid."""
+
+        for serializer in (self.serializer, *self.old_serializers):
+            try:
+                return serializer.loads(token, max_age=expiration)
+            except SignatureExpired:
+                # signed with this secret, the other ones won't verify it
+                return False
+            except BadSignature:
+                continue
+        return False
@@ -2,12 +2,17 @@ from http import HTTPStatus
 from typing import Dict
 
 from app import messages
+from app.database.models.scheduler_job_run import SchedulerJobRunModel
 from app.database.models.user import UserModel
-from app.utils.decorator_utils import email_verification_required
+from app.utils.claims_utils import revoke_user_claims
+from app.utils.decorator_utils import email_verification_required, is_admin_user
 
 
 class AdminDAO:
 
+    DEFAULT_SCHEDULER_JOB_RUNS_LIMIT = 50
+    MAX_SCHEDULER_JOB_RUNS_LIMIT = 500
+
     @staticmethod
     @email_verification_required
     def assign_new_user(user_id: int, data: Dict[str, str]):
@@ -17,13 +22,8 @@ class AdminDAO:
         if user_id == new_admin_user_id:
             return messages.USER_CANNOT_BE_ASSIGNED_ADMIN_BY_USER, HTTPStatus.FORBIDDEN
 
-        admin_user = UserModel.find_by_id(user_id)
-
-        if admin_user:
-            if not admin_user.is_admin:
-                return messages.USER_ASSIGN_NOT_ADMIN, HTTPStatus.FORBIDDEN
-        else:
-            return messages.USER_NOT_FOUND, HTTPStatus.NOT_FOUND
+        if not is_admin_user(user_id):
+            return messages.USER_ASSIGN_NOT_ADMIN, HTTPStatus.FORBIDDEN
 
         new_admin_user = UserModel.find_by_id(new_admin_user_id)
 
@@ -52,13 +52,8 @@ class AdminDAO:
 
         new_admin_user = UserModel.find_by_id(admin_user_id)
 
-        admin_user = UserModel.find_by_id(user_id)
-
-        if admin_user:
-            if not admin_user.is_admin:
-                return messages.USER_REVOKE_NOT_ADMIN, HTTPStatus.FORBIDDEN
-        else:
-            return messages.USER_NOT_FOUND, HTTPStatus.NOT_FOUND
+        if not is_admin_user(user_id):
+            return messages.USER_REVOKE_NOT_ADMIN, HTTPStatus.FORBIDDEN
 
         if new_admin_user:
 
@@ -67,6 +62,8 @@ class AdminDAO:
 
             new_admin_user.is_admin = False
             new_admin_user.save_to_db()
+            # the access tokens of the user still claim the admin status
+            revoke_user_claims(admin_user_id)
 
             return messages.USER_ADMIN_STATUS_WAS_REVOKED, HTTPStatus.OK
 
@@ -75,7 +72,16 @@ class AdminDAO:
     @staticmethod
     def list_admins(user_id):
 
-        users_list = UserModel.query.filter(UserModel.id != user_id).all()
-        list_of_users = [user.json() for user in users_list if user.is_admin]
+        admins = UserModel.query.with_entities(*UserModel.public_columns()).filter(
+            UserModel.is_admin, UserModel.id != user_id
+        )
+
+        return [admin._asdict() for admin in admins]
+
+    @staticmethod
+    def list_scheduler_job_runs(
+        job_id: str = None, limit: int = DEFAULT_SCHEDULER_JOB_RUNS_LIMIT
+    ):
 
-        return list_of_users
+        limit = max(1, min(limit, AdminDAO.MAX_SCHEDULER_JOB_RUNS_LIMIT))
+        return SchedulerJobRunModel.find_latest(job_id, limit)
@@ -8,6 +8,7 @@ from app.database.models.tasks_list import TasksListModel
 from app.database.models.user import UserModel
 from app.utils.decorator_utils import email_verification_required
 from app.utils.enum_utils import MentorshipRelationState
+from app.utils.pagination_utils import decode_cursor, encode_cursor
 
 
 class MentorshipRelationDAO:
@@ -15,6 +16,10 @@ class MentorshipRelationDAO:
     MAXIMUM_MENTORSHIP_DURATION = timedelta(weeks=24)
     MINIMUM_MENTORSHIP_DURATION = timedelta(weeks=4)
 
+    DEFAULT_RELATIONS_PER_PAGE = 20
+    MAX_RELATIONS_PER_PAGE = 100
+    RELATIONS_SORT_FIELDS = ("creation_date", "end_date")
+
     def create_mentorship_relation(self, user_id: int, data: Dict[str, str]):
 
         action_user_id = user_id
@@ -60,19 +65,11 @@ class MentorshipRelationDAO:
         if not mentee_user.need_mentoring:
             return messages.MENTEE_NOT_AVAIL_TO_BE_MENTORED, HTTPStatus.BAD_REQUEST
 
-        all_mentor_relations = (
-            mentor_user.mentor_relations + mentor_user.mentee_relations
-        )
-        for relation in all_mentor_relations:
-            if relation.state == MentorshipRelationState.ACCEPTED:
-                return messages.MENTOR_ALREADY_IN_A_RELATION, HTTPStatus.BAD_REQUEST
+        if MentorshipRelationModel.is_in_accepted_relation(mentor_id):
+            return messages.MENTOR_ALREADY_IN_A_RELATION, HTTPStatus.BAD_REQUEST
 
-        all_mentee_relations = (
-            mentee_user.mentor_relations + mentee_user.mentee_relations
-        )
-        for relation in all_mentee_relations:
-            if relation.state == MentorshipRelationState.ACCEPTED:
-                return messages.MENTEE_ALREADY_IN_A_RELATION, HTTPStatus.BAD_REQUEST
+        if MentorshipRelationModel.is_in_accepted_relation(mentee_id):
+            return messages.MENTEE_ALREADY_IN_A_RELATION, HTTPStatus.BAD_REQUEST
 
         tasks_list = TasksListModel()
         tasks_list.save_to_db()
@@ -94,7 +91,13 @@ class MentorshipRelationDAO:
 
     @staticmethod
     @email_verification_required
-    def list_mentorship_relations(user_id=None, state=None):
+    def list_mentorship_relations(
+        user_id=None,
+        state=None,
+        sort_by="creation_date",
+        cursor="",
+        limit=DEFAULT_RELATIONS_PER_PAGE,
+    ):
 
         valid_states = ["PENDING", "ACCEPTED", "REJECTED", "CANCELLED", "COMPLETED"]
 
@@ -103,27 +106,61 @@ class MentorshipRelationDAO:
                 return True
             return False
 
-        user = UserModel.find_by_id(user_id)
-        all_relations = user.mentor_relations + user.mentee_relations
-
         if state:
             if isValidState(state):
-                all_relations = list(
-                    filter(lambda rel: (rel.state.name == state), all_relations)
-                )
+                state = MentorshipRelationState[state]
             else:
                 return [], HTTPStatus.BAD_REQUEST
 
-        for relation in all_relations:
-            setattr(relation, "sent_by_me", relation.action_user_id == user_id)
+        return MentorshipRelationDAO._list_relations_page(
+            user_id, sort_by, cursor, limit, state=state
+        )
 
-        return all_relations, HTTPStatus.OK
+    @staticmethod
+    def _list_relations_page(user_id, sort_by, cursor, limit, **filters):
+        """Returns a page of the relations of the user matching the filters,
+        the latest first by sort_by. The relations are keyset paginated on
+        (sort_by, id), the cursor of the next page is returned in the
+        X-Next-Cursor header, which is absent on the last page."""
+
+        if sort_by not in MentorshipRelationDAO.RELATIONS_SORT_FIELDS:
+            return messages.SORT_FIELD_IS_INVALID, HTTPStatus.BAD_REQUEST
+
+        after = None
+        if cursor:
+            values = decode_cursor(cursor, 3)
+            if (
+                values is None
+                or values[0] != sort_by
+                or not isinstance(values[1], (int, float))
+                or not isinstance(values[2], int)
+            ):
+                return messages.PAGINATION_CURSOR_IS_INVALID, HTTPStatus.BAD_REQUEST
+            after = values[1:]
+
+        if limit < 1:
+            limit = MentorshipRelationDAO.DEFAULT_RELATIONS_PER_PAGE
+        limit = min(limit, MentorshipRelationDAO.MAX_RELATIONS_PER_PAGE)
+
+        # one extra row tells if there is a next page without counting
+        relations = MentorshipRelationModel.find_page_by_user(
+            user_id, sort_by, after, limit + 1, **filters
+        )
+
+        headers = {}
+        if len(relations) > limit:
+            relations = relations[:limit]
+            last_relation = relations[-1]
+            headers["X-Next-Cursor"] = encode_cursor(
+                sort_by, getattr(last_relation, sort_by), last_relation.id
+            )
+
+        return relations, HTTPStatus.OK, headers
 
     @staticmethod
     @email_verification_required
     def accept_request(user_id: int, request_id: int):
 
-        user = UserModel.find_by_id(user_id)
         request = MentorshipRelationModel.find_by_id(request_id)
 
         if request is None:
@@ -141,34 +178,32 @@ class MentorshipRelationDAO:
         if not (request.mentee_id == user_id or request.mentor_id == user_id):
             return messages.CANT_ACCEPT_UNINVOLVED_MENTOR_RELATION, HTTPStatus.FORBIDDEN
 
-        my_requests = user.mentee_relations + user.mentor_relations
+        mentor_id = request.mentor_id
+        mentee_id = request.mentee_id
 
-        for my_request in my_requests:
-            if my_request.state == MentorshipRelationState.ACCEPTED:
+        def find_accepted_relation_conflict():
+            if MentorshipRelationModel.is_in_accepted_relation(user_id):
                 return (
                     messages.USER_IS_INVOLVED_IN_A_MENTORSHIP_RELATION,
                     HTTPStatus.FORBIDDEN,
                 )
-
-        mentee = request.mentee
-        mentor = request.mentor
-
-        if user_id == mentor.id:
-            mentee_requests = mentee.mentee_relations + mentee.mentor_relations
-
-            for mentee_request in mentee_requests:
-                if mentee_request.state == MentorshipRelationState.ACCEPTED:
+            if user_id == mentor_id:
+                if MentorshipRelationModel.is_in_accepted_relation(mentee_id):
                     return messages.MENTEE_ALREADY_IN_A_RELATION, HTTPStatus.BAD_REQUEST
+            elif MentorshipRelationModel.is_in_accepted_relation(mentor_id):
+                return messages.MENTOR_ALREADY_IN_A_RELATION, HTTPStatus.BAD_REQUEST
+            return None
 
-        else:
-            mentor_requests = mentor.mentee_relations + mentor.mentor_relations
-
-            for mentor_request in mentor_requests:
-                if mentor_request.state == MentorshipRelationState.ACCEPTED:
-                    return messages.MENTOR_ALREADY_IN_A_RELATION, HTTPStatus.BAD_REQUEST
+        conflict = find_accepted_relation_conflict()
+        if conflict:
+            return conflict
 
-        request.state = MentorshipRelationState.ACCEPTED
-        request.save_to_db()
+        if not request.accept():
+            # another relation of the mentor or the mentee was accepted meanwhile
+            return find_accepted_relation_conflict() or (
+                messages.USER_IS_INVOLVED_IN_A_MENTORSHIP_RELATION,
+                HTTPStatus.FORBIDDEN,
+            )
 
         return messages.MENTORSHIP_RELATION_WAS_ACCEPTED_SUCCESSFULLY, HTTPStatus.OK
 
@@ -220,6 +255,7 @@ class MentorshipRelationDAO:
             return messages.CANT_CANCEL_UNINVOLVED_REQUEST, HTTPStatus.FORBIDDEN
 
         request.state = MentorshipRelationState.CANCELLED
+        UserModel.release_relations([request.id])
         request.save_to_db()
 
         return messages.MENTORSHIP_RELATION_WAS_CANCELLED_SUCCESSFULLY, HTTPStatus.OK
@@ -248,51 +284,46 @@ class MentorshipRelationDAO:
 
     @staticmethod
     @email_verification_required
-    def list_past_mentorship_relations(user_id: int):
+    def list_past_mentorship_relations(
+        user_id: int,
+        sort_by="end_date",
+        cursor="",
+        limit=DEFAULT_RELATIONS_PER_PAGE,
+    ):
 
-        user = UserModel.find_by_id(user_id)
         now_timestamp = datetime.utcnow().timestamp()
-        past_relations = list(
-            filter(
-                lambda relation: relation.end_date < now_timestamp,
-                user.mentor_relations + user.mentee_relations,
-            )
+        return MentorshipRelationDAO._list_relations_page(
+            user_id, sort_by, cursor, limit, ended_before=now_timestamp
         )
 
-        for relation in past_relations:
-            setattr(relation, "sent_by_me", relation.action_user_id == user_id)
-
-        return past_relations, HTTPStatus.OK
-
     @staticmethod
     @email_verification_required
     def list_current_mentorship_relation(user_id: int):
 
-        user = UserModel.find_by_id(user_id)
-        all_relations = user.mentor_relations + user.mentee_relations
+        accepted_relations = MentorshipRelationModel.find_by_user(
+            user_id, state=MentorshipRelationState.ACCEPTED
+        )
 
-        for relation in all_relations:
-            if relation.state == MentorshipRelationState.ACCEPTED:
-                setattr(relation, "sent_by_me", relation.action_user_id == user_id)
-                return relation
+        if accepted_relations:
+            return accepted_relations[0]
 
         return messages.NOT_IN_MENTORED_RELATION_CURRENTLY, HTTPStatus.OK
 
     @staticmethod
     @email_verification_required
-    def list_pending_mentorship_relations(user_id: int):
+    def list_pending_mentorship_relations(
+        user_id: int,
+        sort_by="creation_date",
+        cursor="",
+        limit=DEFAULT_RELATIONS_PER_PAGE,
+    ):
 
-        user = UserModel.find_by_id(user_id)
         now_timestamp = datetime.utcnow().timestamp()
-        pending_requests = []
-        all_relations = user.mentor_relations + user.mentee_relations
-
-        for relation in all_relations:
-            if (
-                relation.state == MentorshipRelationState.PENDING
-                and relation.end_date > now_timestamp
-            ):
-                setattr(relation, "sent_by_me", relation.action_user_id == user_id)
-                pending_requests += [relation]
-
-        return pending_requests, HTTPStatus.OK
+        return MentorshipRelationDAO._list_relations_page(
+            user_id,
+            sort_by,
+            cursor,
+            limit,
+            state=MentorshipRelationState.PENDING,
+            ends_after=now_timestamp,
+        )
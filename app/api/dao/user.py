@@ -1,19 +1,26 @@
 from datetime import datetime
 from http import HTTPStatus
-from operator import itemgetter
 from typing import Dict
 
 from flask_restx import marshal
-from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 from app import messages
-from app.api.dao.mentorship_relation import MentorshipRelationDAO
+from app.api.cache_extension import cache
 from app.api.email_utils import confirm_token
 from app.api.models.task import list_tasks_response_body
 from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.tasks_list import TaskModel
 from app.database.models.user import UserModel
-from app.utils.decorator_utils import email_verification_required
+from app.database.user_search import get_user_search_backend
+from app.utils.claims_utils import revoke_user_claims
+from app.utils.decorator_utils import (
+    email_verification_required,
+    find_request_user,
+    invalidate_request_user,
+)
 from app.utils.enum_utils import MentorshipRelationState
+from app.utils.pagination_utils import decode_cursor, encode_cursor
 from app.utils.validation_utils import is_email_valid
 
 
@@ -25,6 +32,9 @@ class UserDAO:
     DEFAULT_PAGE = 1
     DEFAULT_USERS_PER_PAGE = 10
     MAX_USERS_PER_PAGE = 50
+    DEFAULT_ACHIEVEMENTS_LIMIT = 10
+    MAX_ACHIEVEMENTS_LIMIT = 50
+    HOME_ACHIEVEMENTS_LIMIT = 3
 
     @staticmethod
     def create_user(data: Dict[str, str]):
@@ -64,7 +74,9 @@ class UserDAO:
     @email_verification_required
     def delete_user(user_id: int):
 
-        user = UserModel.find_by_id(user_id)
+        user = find_request_user(user_id)
+        if user is None:
+            return messages.USER_DOES_NOT_EXIST, HTTPStatus.NOT_FOUND
 
         # check if this user is the only admin
         if user.is_admin:
@@ -74,13 +86,19 @@ class UserDAO:
                 return messages.USER_CANT_DELETE, HTTPStatus.BAD_REQUEST
 
         user.delete_from_db()
+        invalidate_request_user(user_id)
+        revoke_user_claims(user_id)
         return messages.USER_SUCCESSFULLY_DELETED, HTTPStatus.OK
 
     @staticmethod
     @email_verification_required
     def get_user(user_id: int):
 
-        return UserModel.find_by_id(user_id)
+        user = find_request_user(user_id)
+        if user is None:
+            return messages.USER_DOES_NOT_EXIST, HTTPStatus.NOT_FOUND
+
+        return user
 
     @staticmethod
     def get_user_by_email(email: str):
@@ -100,14 +118,15 @@ class UserDAO:
         per_page: int = DEFAULT_USERS_PER_PAGE,
         is_verified=None,
     ):
-        users_list = (
-            UserModel.query.filter(
-                UserModel.id != user_id,
-                not is_verified or UserModel.is_email_verified,
-                func.lower(UserModel.name).contains(search_query.lower())
-                | func.lower(UserModel.username).contains(search_query.lower()),
+        users_query = UserDAO._users_query(user_id, search_query, is_verified)
+        if search_query:
+            # users whose name or username starts with the query come first
+            users_query = users_query.order_by(
+                get_user_search_backend().rank(search_query)
             )
-            .order_by(UserModel.id)
+
+        users_list = (
+            users_query.order_by(UserModel.id)
             .paginate(
                 page=page,
                 per_page=per_page,
@@ -117,29 +136,90 @@ class UserDAO:
             .items
         )
 
-        list_of_users = [user.json() for user in users_list]
+        return UserDAO._users_json(users_list), HTTPStatus.OK
+
+    @staticmethod
+    def list_users_by_cursor(
+        user_id: int,
+        search_query: str = "",
+        cursor: str = "",
+        per_page: int = DEFAULT_USERS_PER_PAGE,
+        is_verified=None,
+    ):
+        """Keyset paginated version of list_users.
+
+        Users are returned ordered by id, starting after the user encoded in
+        the cursor, so no COUNT or OFFSET scan is needed. The cursor of the
+        next page is returned in the X-Next-Cursor header, which is absent
+        on the last page.
+        """
+
+        last_user_id = 0
+        if cursor:
+            values = decode_cursor(cursor)
+            if values is None or not isinstance(values[0], int):
+                return messages.PAGINATION_CURSOR_IS_INVALID, HTTPStatus.BAD_REQUEST
+            last_user_id = values[0]
+
+        if per_page < 1:
+            per_page = UserDAO.DEFAULT_USERS_PER_PAGE
+        per_page = min(per_page, UserDAO.MAX_USERS_PER_PAGE)
+
+        # one extra row tells if there is a next page without counting
+        users_list = (
+            UserDAO._users_query(user_id, search_query, is_verified)
+            .filter(UserModel.id > last_user_id)
+            .order_by(UserModel.id)
+            .limit(per_page + 1)
+            .all()
+        )
+
+        headers = {}
+        if len(users_list) > per_page:
+            users_list = users_list[:per_page]
+            headers["X-Next-Cursor"] = encode_cursor(users_list[-1].id)
+
+        return UserDAO._users_json(users_list), HTTPStatus.OK, headers
+
+    @staticmethod
+    def _users_query(user_id: int, search_query: str, is_verified):
+
+        # is_available is computed in the same query through a correlated
+        # EXISTS, instead of looking up the current relation of every user
+        return UserModel.query.with_entities(
+            *UserModel.public_columns(),
+            MentorshipRelationModel.has_accepted_relation(UserModel.id).label(
+                "is_in_relation"
+            ),
+        ).filter(
+            UserModel.id != user_id,
+            not is_verified or UserModel.is_email_verified,
+            get_user_search_backend().condition(search_query),
+        )
 
-        for user in list_of_users:
-            relation = MentorshipRelationDAO.list_current_mentorship_relation(
-                user["id"]
+    @staticmethod
+    def _users_json(users_list):
+
+        list_of_users = []
+        for user in users_list:
+            user_json = user._asdict()
+            # is_available is true
+            # when either need_mentoring or available_to_mentor is true
+            # and the user is not in an accepted relation
+            user_json["is_available"] = not user_json.pop("is_in_relation") and (
+                user.need_mentoring or user.available_to_mentor
             )
-            if isinstance(relation, MentorshipRelationModel):
-                user["is_available"] = False
-            else:
-                # we don't need if statement for this case
-                # is_available is true
-                # when either need_mentoring or available_to_mentor is true
-                user["is_available"] = (
-                    user["need_mentoring"] or user["available_to_mentor"]
-                )
+            list_of_users.append(user_json)
 
-        return list_of_users, HTTPStatus.OK
+        return list_of_users
 
     @staticmethod
     @email_verification_required
     def update_user_profile(user_id: int, data: Dict[str, str]):
 
-        user = UserModel.find_by_id(user_id)
+        user = find_request_user(user_id)
+        if user is None:
+            return messages.USER_DOES_NOT_EXIST, HTTPStatus.NOT_FOUND
 
         username = data.get("username", None)
         if username:
@@ -234,7 +314,10 @@ class UserDAO:
         current_password = data["current_password"]
         new_password = data["new_password"]
 
-        user = UserModel.find_by_id(user_id)
+        user = find_request_user(user_id)
+        if user is None:
+            return messages.USER_DOES_NOT_EXIST, HTTPStatus.NOT_FOUND
+
         if user.check_password(current_password):
             user.set_password(new_password)
             user.save_to_db()
@@ -257,6 +340,7 @@ class UserDAO:
             user.is_email_verified = True
             user.email_verification_date = datetime.utcnow()
             user.save_to_db()
+            invalidate_request_user(user.id)
             return messages.ACCOUNT_ALREADY_CONFIRMED_AND_THANKS, HTTPStatus.OK
 
     @staticmethod
@@ -274,96 +358,75 @@ class UserDAO:
 
     @staticmethod
     @email_verification_required
-    def get_achievements(user_id: int):
-
-        user = UserModel.find_by_id(user_id)
-        all_relations = user.mentor_relations + user.mentee_relations
-        tasks = []
-        for relation in all_relations:
-            tasks += relation.tasks_list.tasks
-        achievements = [task for task in tasks if task.get("is_done")]
+    def get_achievements(
+        user_id: int, limit: int = DEFAULT_ACHIEVEMENTS_LIMIT, before: float = None
+    ):
+
+        if limit < 1:
+            limit = UserDAO.DEFAULT_ACHIEVEMENTS_LIMIT
+        limit = min(limit, UserDAO.MAX_ACHIEVEMENTS_LIMIT)
+
+        return UserDAO._find_achievements(user_id, limit, before)
+
+    @staticmethod
+    def _find_achievements(user_id: int, limit: int, before: float = None):
+        """Returns the tasks completed in the user's relations, most recent first,
+        with completed_at older than before if given."""
+
+        # served by the partial index on completed tasks of each tasks list
+        tasks_query = TaskModel.query.join(
+            MentorshipRelationModel,
+            MentorshipRelationModel.tasks_list_id == TaskModel.tasks_list_id,
+        ).filter(
+            MentorshipRelationModel.involving_user(user_id),
+            TaskModel.is_done,
+        )
+        if before is not None:
+            tasks_query = tasks_query.filter(TaskModel.completed_at < before)
+
+        tasks = tasks_query.order_by(TaskModel.completed_at.desc()).limit(limit).all()
+        achievements = [task.json() for task in tasks]
         return achievements
 
     @staticmethod
+    @cache.cached("statistics")
     def get_user_statistics(user_id: int):
 
-        user = UserModel.find_by_id(user_id)
+        user = find_request_user(user_id)
 
         if not user:
             return None
 
-        all_relations = user.mentor_relations + user.mentee_relations
-        (
-            pending_requests,
-            accepted_requests,
-            rejected_requests,
-            completed_relations,
-            cancelled_relations,
-        ) = (0, 0, 0, 0, 0)
-        for relation in all_relations:
-            if relation.state == MentorshipRelationState.PENDING:
-                pending_requests += 1
-            elif relation.state == MentorshipRelationState.ACCEPTED:
-                accepted_requests += 1
-            elif relation.state == MentorshipRelationState.REJECTED:
-                rejected_requests += 1
-            elif relation.state == MentorshipRelationState.COMPLETED:
-                completed_relations += 1
-            elif relation.state == MentorshipRelationState.CANCELLED:
-                cancelled_relations += 1
-
-        achievements = UserDAO.get_achievements(user_id)
-        if achievements:
-            # We only need the last three of these achievements
-            achievements = achievements[-3:]
-            achievements.sort(key=itemgetter("completed_at"), reverse=True)
+        states_count = MentorshipRelationModel.count_states_by_user(user_id)
+
+        # We only need the last three of these achievements
+        achievements = UserDAO._find_achievements(
+            user_id, UserDAO.HOME_ACHIEVEMENTS_LIMIT
+        )
 
         response = {
             "name": user.name,
-            "pending_requests": pending_requests,
-            "accepted_requests": accepted_requests,
-            "rejected_requests": rejected_requests,
-            "completed_relations": completed_relations,
-            "cancelled_relations": cancelled_relations,
+            "pending_requests": states_count.get(MentorshipRelationState.PENDING, 0),
+            "accepted_requests": states_count.get(MentorshipRelationState.ACCEPTED, 0),
+            "rejected_requests": states_count.get(MentorshipRelationState.REJECTED, 0),
+            "completed_relations": states_count.get(
+                MentorshipRelationState.COMPLETED, 0
+            ),
+            "cancelled_relations": states_count.get(
+                MentorshipRelationState.CANCELLED, 0
+            ),
             "achievements": achievements,
         }
         return response
 
     @staticmethod
+    @cache.cached("dashboard")
     def get_user_dashboard(user_id):
 
-        user = UserModel.find_by_id(user_id)
+        user = find_request_user(user_id)
         if not user:
             return None
 
-        response = {}
-
-        all_user_relations = user.mentee_relations + user.mentor_relations
-        relations_in_response_form = [
-            DashboardRelationResponseModel(relation) for relation in all_user_relations
-        ]
-
-        mentor_sent_relations = [
-            relation
-            for relation in relations_in_response_form
-            if relation.action_user_id == user_id and relation.mentor_id == user_id
-        ]
-        mentor_received_relations = [
-            relation
-            for relation in relations_in_response_form
-            if relation.action_user_id != user_id and relation.mentor_id == user_id
-        ]
-        mentee_sent_relations = [
-            relation
-            for relation in relations_in_response_form
-            if relation.action_user_id == user_id and relation.mentee_id == user_id
-        ]
-        mentee_received_relations = [
-            relation
-            for relation in relations_in_response_form
-            if relation.action_user_id != user_id and relation.mentee_id == user_id
-        ]
-
         as_mentee = {
             "sent": {
                 "accepted": [],
@@ -396,132 +459,42 @@ class UserDAO:
                 "pending": [],
             },
         }
-
-        as_mentee["received"]["accepted"] = [
-            relation.response
-            for relation in mentee_received_relations
-            if relation.state == MentorshipRelationState.ACCEPTED
-        ]
-        as_mentee["received"]["rejected"] = [
-            relation.response
-            for relation in mentee_received_relations
-            if relation.state == MentorshipRelationState.REJECTED
-        ]
-        as_mentee["received"]["completed"] = [
-            relation.response
-            for relation in mentee_received_relations
-            if relation.state == MentorshipRelationState.COMPLETED
-        ]
-        as_mentee["received"]["cancelled"] = [
-            relation.response
-            for relation in mentee_received_relations
-            if relation.state == MentorshipRelationState.CANCELLED
-        ]
-        as_mentee["received"]["pending"] = [
-            relation.response
-            for relation in mentee_received_relations
-            if relation.state == MentorshipRelationState.PENDING
-        ]
-
-        as_mentor["received"]["accepted"] = [
-            relation.response
-            for relation in mentor_received_relations
-            if relation.state == MentorshipRelationState.ACCEPTED
-        ]
-        as_mentor["received"]["rejected"] = [
-            relation.response
-            for relation in mentor_received_relations
-            if relation.state == MentorshipRelationState.REJECTED
-        ]
-        as_mentor["received"]["completed"] = [
-            relation.response
-            for relation in mentor_received_relations
-            if relation.state == MentorshipRelationState.COMPLETED
-        ]
-        as_mentor["received"]["cancelled"] = [
-            relation.response
-            for relation in mentor_received_relations
-            if relation.state == MentorshipRelationState.CANCELLED
-        ]
-        as_mentor["received"]["pending"] = [
-            relation.response
-            for relation in mentor_received_relations
-            if relation.state == MentorshipRelationState.PENDING
-        ]
-
-        as_mentee["sent"]["accepted"] = [
-            relation.response
-            for relation in mentee_sent_relations
-            if relation.state == MentorshipRelationState.ACCEPTED
-        ]
-        as_mentee["sent"]["rejected"] = [
-            relation.response
-            for relation in mentee_sent_relations
-            if relation.state == MentorshipRelationState.REJECTED
-        ]
-        as_mentee["sent"]["completed"] = [
-            relation.response
-            for relation in mentee_sent_relations
-            if relation.state == MentorshipRelationState.COMPLETED
-        ]
-        as_mentee["sent"]["cancelled"] = [
-            relation.response
-            for relation in mentee_sent_relations
-            if relation.state == MentorshipRelationState.CANCELLED
-        ]
-        as_mentee["sent"]["pending"] = [
-            relation.response
-            for relation in mentee_sent_relations
-            if relation.state == MentorshipRelationState.PENDING
-        ]
-
-        as_mentor["sent"]["accepted"] = [
-            relation.response
-            for relation in mentor_sent_relations
-            if relation.state == MentorshipRelationState.ACCEPTED
-        ]
-        as_mentor["sent"]["rejected"] = [
-            relation.response
-            for relation in mentor_sent_relations
-            if relation.state == MentorshipRelationState.REJECTED
-        ]
-        as_mentor["sent"]["completed"] = [
-            relation.response
-            for relation in mentor_sent_relations
-            if relation.state == MentorshipRelationState.COMPLETED
-        ]
-        as_mentor["sent"]["cancelled"] = [
-            relation.response
-            for relation in mentor_sent_relations
-            if relation.state == MentorshipRelationState.CANCELLED
-        ]
-        as_mentor["sent"]["pending"] = [
-            relation.response
-            for relation in mentor_sent_relations
-            if relation.state == MentorshipRelationState.PENDING
-        ]
-
-        response["as_mentor"] = as_mentor
-        response["as_mentee"] = as_mentee
-
-        current_relation = MentorshipRelationDAO.list_current_mentorship_relation(
-            user_id=user_id
+        response = {"as_mentor": as_mentor, "as_mentee": as_mentee}
+
+        # mentor and mentee are loaded in the same query as the relations,
+        # so the dashboard costs the same number of queries for any user
+        all_user_relations = (
+            MentorshipRelationModel.query.options(
+                joinedload(MentorshipRelationModel.mentor),
+                joinedload(MentorshipRelationModel.mentee),
+            )
+            .filter(MentorshipRelationModel.involving_user(user_id))
+            .order_by(MentorshipRelationModel.id)
+            .all()
         )
 
-        if current_relation != (
-            messages.NOT_IN_MENTORED_RELATION_CURRENTLY,
-            HTTPStatus.OK,
-        ):
+        current_relation = None
+        for relation in all_user_relations:
+            role = as_mentor if relation.mentor_id == user_id else as_mentee
+            direction = "sent" if relation.action_user_id == user_id else "received"
+            role[direction][relation.state.name.lower()].append(
+                DashboardRelationResponseModel(relation).response
+            )
+
+            if (
+                current_relation is None
+                and relation.state == MentorshipRelationState.ACCEPTED
+            ):
+                current_relation = relation
+
+        if current_relation is not None:
+            tasks = current_relation.tasks_list.tasks
             response["tasks_todo"] = marshal(
-                [
-                    task
-                    for task in current_relation.tasks_list.tasks
-                    if not task["is_done"]
-                ],
+                [task for task in tasks if not task["is_done"]],
                 list_tasks_response_body,
             )
             response["tasks_done"] = marshal(
-                [task for task in current_relation.tasks_list.tasks if task["is_done"]],
+                [task for task in tasks if task["is_done"]],
                 list_tasks_response_body,
             )
 
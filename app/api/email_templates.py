@@ -0,0 +1,57 @@
+"""
+This module is used to render the emails sent by the app.
+
+The email templates are compiled once, when the app is created, and are
+rendered straight from the compiled template, skipping the context
+processors and signals of flask.render_template, which emails don't use.
+The confirmation url is built once per host from the api routes and then
+only has the token put in it. The host comes from the request when
+SERVER_NAME isn't configured, so the urls of only a few hosts are kept.
+"""
+from flask import has_request_context, request
+
+EMAIL_TEMPLATES = (
+    "email_confirmation.html",
+    "email_relation_request.html",
+    "mentorship_relation_accepted.html",
+)
+
+# tokens are url safe, so this can be replaced without quoting the token
+TOKEN_PLACEHOLDER = "__confirmation_token__"
+
+MAX_CONFIRM_URL_FORMATS = 16
+
+
+class EmailTemplates:
+    def __init__(self):
+        self._templates = {}
+        self._confirm_url_formats = {}
+
+    def init_app(self, app):
+        for template_name in EMAIL_TEMPLATES:
+            self._templates[template_name] = app.jinja_env.get_template(template_name)
+
+        app.extensions["email_templates"] = self
+
+    def render(self, template_name: str, **context) -> str:
+        return self._templates[template_name].render(**context)
+
+    def confirm_url(self, token: str) -> str:
+        """Returns the external url confirming the email with the given token."""
+
+        host_url = request.host_url if has_request_context() else None
+        confirm_url_format = self._confirm_url_formats.get(host_url)
+        if confirm_url_format is None:
+            from app.api.api_extension import api
+            from app.api.resources.user import UserEmailConfirmation
+
+            confirm_url_format = api.url_for(
+                UserEmailConfirmation, token=TOKEN_PLACEHOLDER, _external=True
+            )
+            if len(self._confirm_url_formats) < MAX_CONFIRM_URL_FORMATS:
+                self._confirm_url_formats[host_url] = confirm_url_format
+
+        return confirm_url_format.replace(TOKEN_PLACEHOLDER, token)
+
+
+email_templates = EmailTemplates()
@@ -1,32 +1,23 @@
 import datetime
 
-from flask import render_template
+from flask import current_app
 from flask_mail import Message
-from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
 
 import config
-from app.api.mail_extension import mail
+from app.api.email_templates import email_templates
+from app.api.mail_extension import mail_pool
+from app.database.models.email_outbox import EmailOutboxModel
+from app.database.sqlalchemy_extension import db
+from app.schedulers.email_outbox_worker import email_outbox_worker
 
 
 def generate_confirmation_token(email):
-    from run import application
-
-    serializer = URLSafeTimedSerializer(application.config["SECRET_KEY"])
-    return serializer.dumps(email, salt=application.config["SECURITY_PASSWORD_SALT"])
+    return current_app.extensions["confirmation_tokens"].generate(email)
 
 
 def confirm_token(token, expiration=config.BaseConfig.UNVERIFIED_USER_THRESHOLD):
-
-    from run import application
-
-    serializer = URLSafeTimedSerializer(application.config["SECRET_KEY"])
-    try:
-        email = serializer.loads(
-            token, salt=application.config["SECURITY_PASSWORD_SALT"], max_age=expiration
-        )
-    except BadSignature:
-        return False
-    return email
+    return current_app.extensions["confirmation_tokens"].confirm(token, expiration)
 
 
 def mock_send_email(recipient, subject, template):
@@ -38,32 +29,54 @@ def mock_send_email(recipient, subject, template):
 
 
 def send_email(recipient, subject, template):
-    from run import application
+    """
+    Queues the email in the outbox of the current transaction, it is sent by
+    the email outbox worker once the caller commits.
+    """
 
-    if application.config["MOCK_EMAIL"]:
-        mock_send_email(recipient, subject, template)
-    else:
-        msg = Message(
-            subject,
-            recipients=[recipient],
-            html=template,
-            sender=application.config["MAIL_DEFAULT_SENDER"],
+    db.session.add(EmailOutboxModel(recipient, subject, template))
+    event.listen(db.session(), "after_commit", notify_email_outbox_worker, once=True)
+
+
+def notify_email_outbox_worker(session):
+    email_outbox_worker.notify()
+
+
+def deliver_outbox_emails(emails):
+    """
+    Sends the given outbox emails over a single pooled mail server connection.
+    Returns the errors of the emails which couldn't be sent, by email id.
+    """
+
+    failures = {}
+
+    if current_app.config["MOCK_EMAIL"]:
+        for email in emails:
+            mock_send_email(email.recipient, email.subject, email.html)
+        return failures
+
+    msgs = [
+        Message(
+            email.subject,
+            recipients=[email.recipient],
+            html=email.html,
+            sender=current_app.config["MAIL_DEFAULT_SENDER"],
         )
-        mail.send(msg)
+        for email in emails
+    ]
+    errors = mail_pool.send_many(msgs)
+    for email, error in zip(emails, errors):
+        if error is not None:
+            failures[email.id] = error
+
+    return failures
 
 
 def send_email_verification_message(user_name, email):
 
     confirmation_token = generate_confirmation_token(email)
-    from app.api.api_extension import api
-    from app.api.resources.user import (
-        UserEmailConfirmation,
-    )
-
-    confirm_url = api.url_for(
-        UserEmailConfirmation, token=confirmation_token, _external=True
-    )
-    html = render_template(
+    confirm_url = email_templates.confirm_url(confirmation_token)
+    html = email_templates.render(
         "email_confirmation.html",
         confirm_url=confirm_url,
         user_name=user_name,
@@ -71,6 +84,7 @@ def send_email_verification_message(user_name, email):
     )
     subject = "Mentorship System - Please confirm your email"
     send_email(email, subject, html)
+    db.session.commit()
 
 
 def send_email_mentorship_relation_accepted(request_id):
@@ -93,7 +107,7 @@ def send_email_mentorship_relation_accepted(request_id):
     date = datetime.datetime.fromtimestamp(end_date).strftime("%d-%m-%Y")
 
     subject = "Mentorship relation accepted!"
-    html = render_template(
+    html = email_templates.render(
         "mentorship_relation_accepted.html",
         request_sender=request_sender.name,
         request_receiver=request_receiver.name,
@@ -101,11 +115,12 @@ def send_email_mentorship_relation_accepted(request_id):
         end_date=date,
     )
     send_email(request_sender.email, subject, html)
+    db.session.commit()
 
 
 def send_email_new_request(user_sender, user_recipient, notes, sender_role):
 
-    html = render_template(
+    html = email_templates.render(
         "email_relation_request.html",
         user_recipient_name=user_recipient.name,
         user_sender_name=user_sender.name,
@@ -114,3 +129,4 @@ def send_email_new_request(user_sender, user_recipient, notes, sender_role):
     )
     subject = "Mentorship System - You have got new relation request"
     send_email(user_recipient.email, subject, html)
+    db.session.commit()
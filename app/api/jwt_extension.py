@@ -4,6 +4,8 @@ from flask_jwt_extended import JWTManager
 
 from app import messages
 from app.api.api_extension import api
+from app.utils.claims_utils import build_user_claims
+from app.utils.decorator_utils import find_request_user
 
 jwt = JWTManager()
 
@@ -24,3 +26,11 @@ def my_invalid_token_callback(error_message):
 @jwt.unauthorized_loader
 def my_unauthorized_request_callback(error_message):
     return messages.AUTHORISATION_TOKEN_IS_MISSING, HTTPStatus.UNAUTHORIZED
+
+
+@jwt.user_claims_loader
+def add_user_claims_to_access_token(identity):
+    user = find_request_user(identity)
+    if user is None:
+        return {}
+    return build_user_claims(user)
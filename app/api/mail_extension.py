@@ -1,3 +1,124 @@
+import smtplib
+import threading
+import time
+
 from flask_mail import Mail
 
 mail = Mail()
+
+
+class MailConnectionPool:
+    """
+    Keeps up to MAIL_POOL_SIZE authenticated connections to the mail server
+    open, so that sending an email doesn't pay for a new SSL handshake and
+    login each time. Connections idle for more than MAIL_POOL_IDLE_TIMEOUT
+    seconds are closed, and the ones idle for more than
+    MAIL_POOL_HEALTH_CHECK_AFTER seconds are checked with a NOOP before use.
+    """
+
+    def __init__(self, mail_extension):
+        self.mail = mail_extension
+        self.size = 1
+        self.idle_timeout = 0
+        self.health_check_after = 0
+        self._idle_connections = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def init_app(self, app):
+        self.size = app.config["MAIL_POOL_SIZE"]
+        self.idle_timeout = app.config["MAIL_POOL_IDLE_TIMEOUT"]
+        self.health_check_after = app.config["MAIL_POOL_HEALTH_CHECK_AFTER"]
+        self._slots = threading.BoundedSemaphore(self.size)
+
+        app.extensions["mail_pool"] = self
+
+    def _open(self):
+        connection = self.mail.connect()
+        connection.__enter__()
+        return connection
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.__exit__(None, None, None)
+        except (smtplib.SMTPException, OSError):
+            pass
+
+    def _is_healthy(self, connection, idle_time):
+        if connection.host is None:
+            # mail sending is suppressed, e.g. while testing
+            return True
+        if idle_time < self.health_check_after:
+            return True
+        try:
+            return connection.host.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _acquire(self):
+        while True:
+            with self._lock:
+                if not self._idle_connections:
+                    break
+                connection, released_at = self._idle_connections.pop()
+
+            idle_time = time.monotonic() - released_at
+            if idle_time < self.idle_timeout and self._is_healthy(
+                connection, idle_time
+            ):
+                return connection
+            self._close(connection)
+
+        return self._open()
+
+    def _release(self, connection):
+        with self._lock:
+            self._idle_connections.append((connection, time.monotonic()))
+
+    def send_many(self, messages):
+        """
+        Sends the messages over one pooled connection. Returns a list with the
+        error of each message, None for the messages which were sent. If the
+        connection drops, the following messages are sent over a new one, or
+        get the error of opening it.
+        """
+
+        errors = []
+        with self._slots:
+            connection = self._acquire()
+            try:
+                for index, message in enumerate(messages):
+                    try:
+                        connection.send(message)
+                        errors.append(None)
+                    except (smtplib.SMTPServerDisconnected, OSError) as error:
+                        errors.append(str(error))
+                        self._close(connection)
+                        connection = None
+                        try:
+                            connection = self._open()
+                        except (smtplib.SMTPException, OSError) as error:
+                            errors.extend([str(error)] * (len(messages) - index - 1))
+                            break
+                    except Exception as error:
+                        # e.g. a refused recipient, a bad header, a missing
+                        # sender or an encoding error, only this message fails
+                        errors.append(str(error) or repr(error))
+            finally:
+                if connection is not None:
+                    if len(errors) == len(messages):
+                        self._release(connection)
+                    else:
+                        # interrupted in the middle of a message
+                        self._close(connection)
+
+        return errors
+
+    def send(self, message):
+        error = self.send_many([message])[0]
+        if error is not None:
+            raise smtplib.SMTPException(error)
+
+
+mail_pool = MailConnectionPool(mail)
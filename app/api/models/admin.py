@@ -6,6 +6,9 @@ def add_models_to_namespace(api_namespace):
         assign_and_revoke_user_admin_request_body.name
     ] = assign_and_revoke_user_admin_request_body
     api_namespace.models[public_admin_user_api_model.name] = public_admin_user_api_model
+    api_namespace.models[
+        scheduler_job_run_response_body.name
+    ] = scheduler_job_run_response_body
 
 
 assign_and_revoke_user_admin_request_body = Model(
@@ -36,3 +39,18 @@ public_admin_user_api_model = Model(
         "skills": fields.String(required=True, description="User skills"),
     },
 )
+
+
+scheduler_job_run_response_body = Model(
+    "Scheduler job run model",
+    {
+        "id": fields.Integer(
+            readOnly=True, description="The unique identifier of a job run"
+        ),
+        "job_id": fields.String(description="The identifier of the scheduled job"),
+        "started_at": fields.Float(description="Start of the run (UNIX timestamp)"),
+        "duration": fields.Float(description="Duration of the run in seconds"),
+        "rows_affected": fields.Integer(description="Number of rows changed"),
+        "error": fields.String(description="Error which failed the run, if any"),
+    },
+)
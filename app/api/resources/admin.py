@@ -6,17 +6,21 @@ from flask_restx import Namespace, Resource, marshal
 
 from app import messages
 from app.api.dao.admin import AdminDAO
-from app.api.dao.user import UserDAO
 from app.api.models.admin import (
     add_models_to_namespace,
     assign_and_revoke_user_admin_request_body,
     public_admin_user_api_model,
+    scheduler_job_run_response_body,
 )
 from app.api.resources.common import auth_header_parser
+from app.utils.decorator_utils import is_admin_user
+from app.utils.marshal_utils import compile_model
 
 admin_ns = Namespace("Admins", description="Operations related to Admin users")
 add_models_to_namespace(admin_ns)
 
+serialize_admin_user = compile_model(public_admin_user_api_model)
+
 
 @admin_ns.route("admin/new")
 @admin_ns.response(HTTPStatus.FORBIDDEN.value, f"{messages.USER_IS_NOW_AN_ADMIN}")
@@ -36,10 +40,9 @@ class AssignNewUserAdmin(Resource):
     def post(cls):
 
         user_id = get_jwt_identity()
-        user = UserDAO.get_user(user_id)
-        if user.is_admin:
+        if is_admin_user(user_id):
             data = request.json
-            return AdminDAO.assign_new_user(user.id, data)
+            return AdminDAO.assign_new_user(user_id, data)
 
         else:
             return messages.USER_ASSIGN_NOT_ADMIN, HTTPStatus.FORBIDDEN
@@ -63,10 +66,9 @@ class RevokeUserAdmin(Resource):
     def post(cls):
 
         user_id = get_jwt_identity()
-        user = UserDAO.get_user(user_id)
-        if user.is_admin:
+        if is_admin_user(user_id):
             data = request.json
-            return AdminDAO.revoke_admin_user(user.id, data)
+            return AdminDAO.revoke_admin_user(user_id, data)
 
         else:
             return messages.USER_REVOKE_NOT_ADMIN, HTTPStatus.FORBIDDEN
@@ -94,14 +96,52 @@ class ListAdmins(Resource):
     def get(cls):
 
         user_id = get_jwt_identity()
-        user = UserDAO.get_user(user_id)
 
-        if user.is_admin:
+        if is_admin_user(user_id):
             list_of_admins = AdminDAO.list_admins(user_id)
-            list_of_admins = [
-                marshal(x, public_admin_user_api_model) for x in list_of_admins
-            ]
+            list_of_admins = [serialize_admin_user(x) for x in list_of_admins]
 
             return list_of_admins, HTTPStatus.OK
         else:
             return messages.USER_IS_NOT_AN_ADMIN, HTTPStatus.FORBIDDEN
+
+
+@admin_ns.route("admin/scheduler/runs")
+class ListSchedulerJobRuns(Resource):
+    @classmethod
+    @jwt_required
+    @admin_ns.doc(
+        "get_list_of_scheduler_job_runs",
+        params={
+            "job_id": "only the runs of this scheduled job",
+            "limit": "specify number of runs (default: 50)",
+        },
+    )
+    @admin_ns.response(
+        HTTPStatus.OK.value,
+        f"{messages.GENERAL_SUCCESS_MESSAGE}",
+        [scheduler_job_run_response_body],
+    )
+    @admin_ns.doc(
+        responses={
+            HTTPStatus.UNAUTHORIZED.value: f"{messages.TOKEN_HAS_EXPIRED}<br>"
+            f"{messages.TOKEN_IS_INVALID}<br>"
+            f"{messages.AUTHORISATION_TOKEN_IS_MISSING}"
+        }
+    )
+    @admin_ns.response(HTTPStatus.FORBIDDEN.value, f"{messages.USER_IS_NOT_AN_ADMIN}")
+    @admin_ns.expect(auth_header_parser)
+    def get(cls):
+        """Get the latest runs of the scheduled jobs, most recent first"""
+
+        user_id = get_jwt_identity()
+        if not is_admin_user(user_id):
+            return messages.USER_IS_NOT_AN_ADMIN, HTTPStatus.FORBIDDEN
+
+        job_id = request.args.get("job_id", default=None, type=str)
+        limit = request.args.get(
+            "limit", default=AdminDAO.DEFAULT_SCHEDULER_JOB_RUNS_LIMIT, type=int
+        )
+        job_runs = AdminDAO.list_scheduler_job_runs(job_id, limit)
+
+        return marshal(job_runs, scheduler_job_run_response_body), HTTPStatus.OK
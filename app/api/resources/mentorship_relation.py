@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 from flask import request
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from flask_restx import Namespace, Resource, marshal
+from flask_restx import Namespace, Resource
 
 from app import messages
 from app.api.dao.mentorship_relation import MentorshipRelationDAO
@@ -17,7 +17,8 @@ from app.api.models.mentorship_relation import (
     send_mentorship_request_body,
 )
 from app.api.resources.common import auth_header_parser
-from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.mentorship_relation import MentorshipRelationView
+from app.utils.marshal_utils import compile_model, marshal_list_with
 
 mentorship_relation_ns = Namespace(
     "Mentorship Relation",
@@ -28,6 +29,33 @@ add_models_to_namespace(mentorship_relation_ns)
 DAO = MentorshipRelationDAO()
 userDAO = UserDAO()
 
+serialize_relation = compile_model(mentorship_request_response_body)
+
+# query parameters of the paginated relation listings
+RELATIONS_PAGINATION_PARAMS = {
+    "sort_by": "sort the relations, latest first, by creation_date or end_date",
+    "limit": "specify number of relations (default: "
+    f"{MentorshipRelationDAO.DEFAULT_RELATIONS_PER_PAGE})",
+    "cursor": "opaque cursor from the X-Next-Cursor header of the previous page",
+}
+
+
+def get_relations_pagination_args(default_sort_by="creation_date"):
+    return {
+        "sort_by": request.args.get("sort_by", default=default_sort_by),
+        "cursor": request.args.get("cursor", default=""),
+        "limit": request.args.get(
+            "limit", default=MentorshipRelationDAO.DEFAULT_RELATIONS_PER_PAGE, type=int
+        ),
+    }
+
+
+def abort_on_pagination_error(response):
+    # the relations are marshalled as a list, so errors are raised instead
+    if response[1] != HTTPStatus.OK and isinstance(response[0], dict):
+        mentorship_relation_ns.abort(response[1].value, response[0]["message"])
+    return response
+
 
 @mentorship_relation_ns.route("mentorship_relation/send_request")
 class SendRequest(Resource):
@@ -115,7 +143,9 @@ class SendRequest(Resource):
 class GetAllMyMentorshipRelation(Resource):
     @classmethod
     @jwt_required
-    @mentorship_relation_ns.doc("get_all_user_mentorship_relations")
+    @mentorship_relation_ns.doc(
+        "get_all_user_mentorship_relations", params=RELATIONS_PAGINATION_PARAMS
+    )
     @mentorship_relation_ns.expect(auth_header_parser)
     @mentorship_relation_ns.param(
         name="relation_state",
@@ -133,25 +163,20 @@ class GetAllMyMentorshipRelation(Resource):
         f"{messages.TOKEN_IS_INVALID}\n"
         f"{messages.AUTHORISATION_TOKEN_IS_MISSING}",
     )
-    @mentorship_relation_ns.marshal_list_with(
-        mentorship_request_response_body,
-        code=HTTPStatus.OK.value,
-        description="Success",
-    )
+    @marshal_list_with(mentorship_relation_ns, mentorship_request_response_body)
     def get(cls):
 
         user_id = get_jwt_identity()
-        rel_state_param = request.args
-        rel_state_filter = None
+        rel_state_filter = request.args.get("relation_state", None)
 
-        if rel_state_param:
-            rel_state_filter = rel_state_param["relation_state"].upper()
+        if rel_state_filter:
+            rel_state_filter = rel_state_filter.upper()
 
         response = DAO.list_mentorship_relations(
-            user_id=user_id, state=rel_state_filter
+            user_id=user_id, state=rel_state_filter, **get_relations_pagination_args()
         )
 
-        return response
+        return abort_on_pagination_error(response)
 
 
 @mentorship_relation_ns.route("mentorship_relation/<int:request_id>/accept")
@@ -296,7 +321,9 @@ class DeleteMentorshipRelation(Resource):
 class ListPastMentorshipRelations(Resource):
     @classmethod
     @jwt_required
-    @mentorship_relation_ns.doc("get_past_mentorship_relations")
+    @mentorship_relation_ns.doc(
+        "get_past_mentorship_relations", params=RELATIONS_PAGINATION_PARAMS
+    )
     @mentorship_relation_ns.expect(auth_header_parser)
     @mentorship_relation_ns.response(
         HTTPStatus.OK.value,
@@ -309,17 +336,15 @@ class ListPastMentorshipRelations(Resource):
         f"{messages.TOKEN_IS_INVALID}\n"
         f"{messages.AUTHORISATION_TOKEN_IS_MISSING}",
     )
-    @mentorship_relation_ns.marshal_list_with(
-        mentorship_request_response_body,
-        code=HTTPStatus.OK.value,
-        description="Success",
-    )
+    @marshal_list_with(mentorship_relation_ns, mentorship_request_response_body)
     def get(cls):
 
         user_id = get_jwt_identity()
-        response = DAO.list_past_mentorship_relations(user_id)
+        response = DAO.list_past_mentorship_relations(
+            user_id, **get_relations_pagination_args(default_sort_by="end_date")
+        )
 
-        return response
+        return abort_on_pagination_error(response)
 
 
 @mentorship_relation_ns.route("mentorship_relations/current")
@@ -344,9 +369,9 @@ class ListCurrentMentorshipRelation(Resource):
         user_id = get_jwt_identity()
         response = DAO.list_current_mentorship_relation(user_id)
 
-        if isinstance(response, MentorshipRelationModel):
+        if isinstance(response, MentorshipRelationView):
             return (
-                marshal(response, mentorship_request_response_body),
+                serialize_relation(response),
                 HTTPStatus.OK,
             )
 
@@ -357,18 +382,16 @@ class ListCurrentMentorshipRelation(Resource):
 class ListPendingMentorshipRequests(Resource):
     @classmethod
     @jwt_required
-    @mentorship_relation_ns.doc("get_pending_mentorship_relations")
+    @mentorship_relation_ns.doc(
+        "get_pending_mentorship_relations", params=RELATIONS_PAGINATION_PARAMS
+    )
     @mentorship_relation_ns.expect(auth_header_parser)
     @mentorship_relation_ns.response(
         HTTPStatus.OK.value,
         "Returned pending mentorship relation with success.",
         model=mentorship_request_response_body,
     )
-    @mentorship_relation_ns.marshal_list_with(
-        mentorship_request_response_body,
-        code=HTTPStatus.OK.value,
-        description="Success",
-    )
+    @marshal_list_with(mentorship_relation_ns, mentorship_request_response_body)
     @mentorship_relation_ns.response(
         HTTPStatus.UNAUTHORIZED.value,
         f"{messages.TOKEN_HAS_EXPIRED}\n"
@@ -378,6 +401,8 @@ class ListPendingMentorshipRequests(Resource):
     def get(cls):
 
         user_id = get_jwt_identity()
-        response = DAO.list_pending_mentorship_relations(user_id)
+        response = DAO.list_pending_mentorship_relations(
+            user_id, **get_relations_pagination_args()
+        )
 
-        return response
+        return abort_on_pagination_error(response)
@@ -13,6 +13,7 @@ from flask_restx import Namespace, Resource, marshal
 from app import messages
 from app.api.dao.user import UserDAO
 from app.api.email_utils import send_email_verification_message
+from app.api.models.task import list_tasks_response_body
 from app.api.models.user import (
     add_models_to_namespace,
     change_password_request_data_model,
@@ -34,6 +35,8 @@ from app.api.validations.user import (
     validate_update_profile_request_data,
     validate_user_registration_request_data,
 )
+from app.utils.claims_utils import build_user_claims
+from app.utils.marshal_utils import marshal_list_with
 
 users_ns = Namespace("Users", description="Operations related to users")
 add_models_to_namespace(users_ns)
@@ -58,6 +61,9 @@ class UserList(Resource):
             "search": "Search query",
             "page": "specify page of users (default: 1)",
             "per_page": "specify number of users per page (default: 10)",
+            "cursor": "opaque cursor from the X-Next-Cursor header of the "
+            "previous page, send it empty to get the first page; "
+            "when given, page is ignored",
         },
     )
     @users_ns.response(
@@ -72,9 +78,7 @@ class UserList(Resource):
             f"{messages.AUTHORISATION_TOKEN_IS_MISSING}"
         }
     )
-    @users_ns.marshal_list_with(
-        public_user_api_model, code=HTTPStatus.OK.value, description="Success"
-    )
+    @marshal_list_with(users_ns, public_user_api_model)
     @users_ns.expect(auth_header_parser)
     def get(cls):
 
@@ -84,6 +88,15 @@ class UserList(Resource):
         )
 
         user_id = get_jwt_identity()
+        cursor = request.args.get("cursor", None)
+        if cursor is not None:
+            result = DAO.list_users_by_cursor(
+                user_id, request.args.get("search", ""), cursor, per_page
+            )
+            if result[1] != HTTPStatus.OK:
+                users_ns.abort(result[1].value, result[0]["message"])
+            return result
+
         return DAO.list_users(user_id, request.args.get("search", ""), page, per_page)
 
 
@@ -222,6 +235,9 @@ class VerifiedUser(Resource):
             "search": "Search query",
             "page": "specify page of users",
             "per_page": "specify number of users per page",
+            "cursor": "opaque cursor from the X-Next-Cursor header of the "
+            "previous page, send it empty to get the first page; "
+            "when given, page is ignored",
         },
     )
     @users_ns.response(
@@ -236,9 +252,7 @@ class VerifiedUser(Resource):
             f"{messages.AUTHORISATION_TOKEN_IS_MISSING}"
         }
     )
-    @users_ns.marshal_list_with(
-        public_user_api_model, code=HTTPStatus.OK.value, description="Success"
-    )  # , skip_none=True
+    @marshal_list_with(users_ns, public_user_api_model)  # , skip_none=True
     @users_ns.expect(auth_header_parser)
     def get(cls):
 
@@ -248,6 +262,19 @@ class VerifiedUser(Resource):
         )
 
         user_id = get_jwt_identity()
+        cursor = request.args.get("cursor", None)
+        if cursor is not None:
+            result = DAO.list_users_by_cursor(
+                user_id,
+                request.args.get("search", ""),
+                cursor,
+                per_page,
+                is_verified=True,
+            )
+            if result[1] != HTTPStatus.OK:
+                users_ns.abort(result[1].value, result[0]["message"])
+            return result
+
         return DAO.list_users(
             user_id, request.args.get("search", ""), page, per_page, is_verified=True
         )
@@ -421,7 +448,9 @@ class LoginUser(Resource):
                 HTTPStatus.FORBIDDEN,
             )
 
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(
+            identity=user.id, user_claims=build_user_claims(user)
+        )
         refresh_token = create_refresh_token(identity=user.id)
 
         return (
@@ -465,6 +494,43 @@ class UserHomeStatistics(Resource):
         return stats, HTTPStatus.OK
 
 
+@users_ns.route("achievements")
+@users_ns.response(
+    HTTPStatus.UNAUTHORIZED.value,
+    f"{messages.TOKEN_HAS_EXPIRED}\n"
+    f"{messages.TOKEN_IS_INVALID}\n"
+    f"{messages.AUTHORISATION_TOKEN_IS_MISSING}",
+)
+class UserAchievements(Resource):
+    @classmethod
+    @jwt_required
+    @users_ns.doc(
+        "get_achievements",
+        params={
+            "limit": "specify number of achievements (default: 10)",
+            "before": "only achievements completed before this UNIX timestamp",
+        },
+    )
+    @users_ns.marshal_list_with(
+        list_tasks_response_body, code=HTTPStatus.OK.value, description="Success"
+    )
+    @users_ns.expect(auth_header_parser)
+    def get(cls):
+        """Get the tasks completed by the current user, most recent first"""
+
+        limit = request.args.get(
+            "limit", default=UserDAO.DEFAULT_ACHIEVEMENTS_LIMIT, type=int
+        )
+        before = request.args.get("before", default=None, type=float)
+
+        user_id = get_jwt_identity()
+        result = DAO.get_achievements(user_id, limit, before)
+        if isinstance(result, tuple):
+            users_ns.abort(result[1].value, result[0]["message"])
+
+        return result
+
+
 @users_ns.route("dashboard")
 @users_ns.expect(auth_header_parser, validate=True)
 @users_ns.response(
@@ -0,0 +1,97 @@
+"""
+This module is used to drop the cached per user responses when a commit
+changes data they are built from.
+
+The users involved are collected from the flushed objects, while the
+session can still emit SQL, and are invalidated once the transaction is
+committed, so a rolled back change doesn't clear anything.
+"""
+from itertools import chain
+
+from sqlalchemy import event, inspect, or_
+from sqlalchemy.orm import Session
+
+from app.api.cache_extension import cache
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.tasks_list import TaskModel, TasksListModel
+from app.database.models.user import UserModel
+
+INVALIDATED_USER_IDS = "user_cache_invalidated_ids"
+
+# user fields shown in the dashboard of the other users in a relation
+USER_FIELDS_SHOWN_TO_PARTNERS = ("name", "photo_url")
+
+
+def init_cache_invalidation():
+    if not event.contains(Session, "after_flush", collect_invalidated_users):
+        event.listen(Session, "after_flush", collect_invalidated_users)
+        event.listen(Session, "after_commit", invalidate_collected_users)
+        event.listen(Session, "after_rollback", discard_collected_users)
+
+
+def collect_invalidated_users(session, flush_context):
+
+    user_ids = session.info.setdefault(INVALIDATED_USER_IDS, set())
+    tasks_list_ids = set()
+    partners_of_user_ids = set()
+
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, MentorshipRelationModel):
+            user_ids.update((instance.mentor_id, instance.mentee_id))
+        elif isinstance(instance, TasksListModel):
+            tasks_list_ids.add(instance.id)
+        elif isinstance(instance, TaskModel):
+            tasks_list_ids.add(instance.tasks_list_id)
+        elif isinstance(instance, UserModel):
+            user_ids.add(instance.id)
+            state = inspect(instance)
+            if any(
+                state.attrs[field].history.has_changes()
+                for field in USER_FIELDS_SHOWN_TO_PARTNERS
+            ):
+                partners_of_user_ids.add(instance.id)
+
+    relation_filters = []
+    if tasks_list_ids:
+        relation_filters.append(
+            MentorshipRelationModel.tasks_list_id.in_(tasks_list_ids)
+        )
+    if partners_of_user_ids:
+        relation_filters.append(
+            MentorshipRelationModel.mentor_id.in_(partners_of_user_ids)
+        )
+        relation_filters.append(
+            MentorshipRelationModel.mentee_id.in_(partners_of_user_ids)
+        )
+
+    if relation_filters:
+        relation_users = session.query(
+            MentorshipRelationModel.mentor_id, MentorshipRelationModel.mentee_id
+        ).filter(or_(*relation_filters))
+        for mentor_id, mentee_id in relation_users:
+            user_ids.update((mentor_id, mentee_id))
+
+    user_ids.discard(None)
+
+
+def collect_users_changed_in_bulk(session, user_ids):
+    """
+    Bulk UPDATE and DELETE statements don't flush objects, the caller
+    collects the users whose data they change before committing.
+    """
+
+    collected_ids = session.info.setdefault(INVALIDATED_USER_IDS, set())
+    collected_ids.update(user_ids)
+    collected_ids.discard(None)
+
+
+def invalidate_collected_users(session):
+
+    user_ids = session.info.pop(INVALIDATED_USER_IDS, None)
+    if user_ids:
+        cache.invalidate_users(user_ids)
+
+
+def discard_collected_users(session):
+
+    session.info.pop(INVALIDATED_USER_IDS, None)
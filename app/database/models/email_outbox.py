@@ -0,0 +1,158 @@
+import time
+import uuid
+
+from sqlalchemy import and_, case, or_
+
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import EmailOutboxState
+
+
+class EmailOutboxModel(db.Model):
+
+    # Specifying database table used for EmailOutboxModel
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        db.Index("ix_email_outbox_state_next_attempt_at", "state", "next_attempt_at"),
+        db.Index("ix_email_outbox_claimed_by", "claimed_by"),
+        {"extend_existing": True},
+    )
+
+    LAST_ERROR_MAX_LENGTH = 500
+    CLAIM_TIMED_OUT = "The worker sending the email didn't report back."
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    recipient = db.Column(db.String(254), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+
+    state = db.Column(db.Enum(EmailOutboxState), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False)
+    next_attempt_at = db.Column(db.Float, nullable=False)
+    last_error = db.Column(db.String(LAST_ERROR_MAX_LENGTH))
+
+    # worker which is sending the email, and since when
+    claimed_by = db.Column(db.String(32))
+    claimed_at = db.Column(db.Float)
+
+    creation_date = db.Column(db.Float, nullable=False)
+    sent_date = db.Column(db.Float)
+
+    def __init__(self, recipient, subject, html):
+
+        self.recipient = recipient
+        self.subject = subject
+        self.html = html
+
+        self.state = EmailOutboxState.PENDING
+        self.attempts = 0
+        self.creation_date = time.time()
+        self.next_attempt_at = self.creation_date
+
+    def json(self):
+        return {
+            "id": self.id,
+            "recipient": self.recipient,
+            "subject": self.subject,
+            "state": self.state,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at,
+            "last_error": self.last_error,
+            "creation_date": self.creation_date,
+            "sent_date": self.sent_date,
+        }
+
+    def __repr__(self):
+        return (
+            f"Email {self.id} to {self.recipient} is {self.state.name}, "
+            f"attempts = {self.attempts}"
+        )
+
+    @classmethod
+    def claim_batch(
+        cls, batch_size: int, claim_timeout: float, max_attempts: int
+    ) -> list:
+        """
+        Claims up to batch_size emails which are due to be sent. Emails claimed
+        by a worker which didn't report back within claim_timeout seconds count
+        as a failed attempt, they are claimed again or, once max_attempts is
+        reached, moved to the DEAD state. Concurrent workers never claim the
+        same email, since the claim is a single conditional UPDATE.
+        """
+
+        now = time.time()
+        is_stale = and_(
+            cls.state == EmailOutboxState.SENDING,
+            cls.claimed_at < now - claim_timeout,
+        )
+        cls.query.filter(is_stale, cls.attempts + 1 >= max_attempts).update(
+            {
+                cls.state: EmailOutboxState.DEAD,
+                cls.attempts: cls.attempts + 1,
+                cls.last_error: cls.CLAIM_TIMED_OUT,
+                cls.claimed_by: None,
+            },
+            synchronize_session=False,
+        )
+        is_due = or_(
+            and_(
+                cls.state == EmailOutboxState.PENDING,
+                cls.next_attempt_at <= now,
+            ),
+            is_stale,
+        )
+
+        due_ids = [
+            email_id
+            for (email_id,) in cls.query.with_entities(cls.id)
+            .filter(is_due)
+            .order_by(cls.next_attempt_at)
+            .limit(batch_size)
+        ]
+        if not due_ids:
+            db.session.commit()
+            return []
+
+        claim = uuid.uuid4().hex
+        cls.query.filter(cls.id.in_(due_ids), is_due).update(
+            {
+                # the stale claims are counted as failed attempts
+                cls.attempts: case(
+                    [(cls.state == EmailOutboxState.SENDING, cls.attempts + 1)],
+                    else_=cls.attempts,
+                ),
+                cls.state: EmailOutboxState.SENDING,
+                cls.claimed_by: claim,
+                cls.claimed_at: now,
+            },
+            synchronize_session=False,
+        )
+        db.session.commit()
+
+        return cls.query.filter_by(claimed_by=claim).all()
+
+    def mark_sent(self) -> None:
+
+        self.state = EmailOutboxState.SENT
+        self.sent_date = time.time()
+        self.claimed_by = None
+
+    def mark_failed(self, error: str, max_attempts: int, retry_delay: float) -> None:
+        """
+        Schedules the email to be sent again with an exponential backoff, or
+        moves it to the DEAD state once max_attempts is reached.
+        """
+
+        self.attempts += 1
+        self.last_error = error[: self.LAST_ERROR_MAX_LENGTH]
+        self.claimed_by = None
+
+        if self.attempts >= max_attempts:
+            self.state = EmailOutboxState.DEAD
+        else:
+            self.state = EmailOutboxState.PENDING
+            self.next_attempt_at = time.time() + retry_delay * 2 ** (self.attempts - 1)
+
+    def save_to_db(self) -> None:
+        db.session.add(self)
+        db.session.commit()
@@ -1,13 +1,71 @@
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
 from app.database.models.tasks_list import TasksListModel
 from app.database.models.user import UserModel
 from app.database.sqlalchemy_extension import db
 from app.utils.enum_utils import MentorshipRelationState
 
 
+class RelationUserView:
+
+    # not a namedtuple, flask-restx marshals any tuple as a list
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class MentorshipRelationView:
+    """Projection of a relation, as listed to one of its users."""
+
+    __slots__ = (
+        "id",
+        "action_user_id",
+        "sent_by_me",
+        "mentor",
+        "mentee",
+        "creation_date",
+        "accept_date",
+        "start_date",
+        "end_date",
+        "state",
+        "notes",
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+
 class MentorshipRelationModel(db.Model):
 
     __tablename__ = "mentorship_relations"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # the relations of a user are looked up as mentor OR mentee
+        db.Index("ix_mentorship_relations_mentor_id_state", "mentor_id", "state"),
+        db.Index("ix_mentorship_relations_mentee_id_state", "mentee_id", "state"),
+        db.Index("ix_mentorship_relations_state_end_date", "state", "end_date"),
+        db.Index("ix_mentorship_relations_tasks_list_id", "tasks_list_id"),
+        # a user is part of at most one ACCEPTED relation, as mentor or mentee
+        db.Index(
+            "ux_mentorship_relations_accepted_mentor_id",
+            "mentor_id",
+            unique=True,
+            postgresql_where=db.text("state = 'ACCEPTED'"),
+            sqlite_where=db.text("state = 'ACCEPTED'"),
+        ),
+        db.Index(
+            "ux_mentorship_relations_accepted_mentee_id",
+            "mentee_id",
+            unique=True,
+            postgresql_where=db.text("state = 'ACCEPTED'"),
+            sqlite_where=db.text("state = 'ACCEPTED'"),
+        ),
+        {"extend_existing": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -77,6 +135,124 @@ class MentorshipRelationModel(db.Model):
     def find_by_id(cls, _id) -> "MentorshipRelationModel":
         return cls.query.filter_by(id=_id).first()
 
+    @classmethod
+    def involving_user(cls, user_id):
+        """Returns the condition matching the relations where the user is
+        either the mentor or the mentee."""
+        return or_(cls.mentor_id == user_id, cls.mentee_id == user_id)
+
+    @classmethod
+    def query_by_user(
+        cls,
+        user_id: int,
+        state: MentorshipRelationState = None,
+        ended_before: float = None,
+        ends_after: float = None,
+    ):
+        """Returns the query of the relations of the user, as mentor or mentee,
+        in the given state and ending before or after the given UNIX
+        timestamps. Only the columns of MentorshipRelationView are selected,
+        with the names of the mentor and mentee joined in."""
+
+        mentor = aliased(UserModel)
+        mentee = aliased(UserModel)
+        query = (
+            db.session.query(
+                cls.id,
+                cls.action_user_id,
+                cls.mentor_id,
+                mentor.name.label("mentor_name"),
+                cls.mentee_id,
+                mentee.name.label("mentee_name"),
+                cls.creation_date,
+                cls.accept_date,
+                cls.start_date,
+                cls.end_date,
+                cls.state,
+                cls.notes,
+            )
+            .outerjoin(mentor, mentor.id == cls.mentor_id)
+            .outerjoin(mentee, mentee.id == cls.mentee_id)
+            .filter(cls.involving_user(user_id))
+        )
+        if state is not None:
+            query = query.filter(cls.state == state)
+        if ended_before is not None:
+            query = query.filter(cls.end_date < ended_before)
+        if ends_after is not None:
+            query = query.filter(cls.end_date > ends_after)
+
+        return query
+
+    @staticmethod
+    def _view(row, user_id: int) -> MentorshipRelationView:
+        return MentorshipRelationView(
+            id=row.id,
+            action_user_id=row.action_user_id,
+            sent_by_me=row.action_user_id == user_id,
+            mentor=RelationUserView(row.mentor_id, row.mentor_name),
+            mentee=RelationUserView(row.mentee_id, row.mentee_name),
+            creation_date=row.creation_date,
+            accept_date=row.accept_date,
+            start_date=row.start_date,
+            end_date=row.end_date,
+            state=row.state,
+            notes=row.notes,
+        )
+
+    @classmethod
+    def find_by_user(cls, user_id: int, **filters) -> list:
+        """Returns the relations of the user as MentorshipRelationView."""
+        query = cls.query_by_user(user_id, **filters).order_by(cls.id)
+        return [cls._view(row, user_id) for row in query]
+
+    @classmethod
+    def find_page_by_user(
+        cls, user_id: int, sort_by: str, after, limit: int, **filters
+    ) -> list:
+        """Returns up to limit relations of the user as MentorshipRelationView,
+        the latest first by the sort_by column, starting after the relation
+        whose (sort_by value, id) is given in after, or from the first one if
+        after is None."""
+
+        sort_column = getattr(cls, sort_by)
+        query = cls.query_by_user(user_id, **filters)
+        if after is not None:
+            last_value, last_id = after
+            query = query.filter(
+                or_(
+                    sort_column < last_value,
+                    and_(sort_column == last_value, cls.id < last_id),
+                )
+            )
+
+        query = query.order_by(sort_column.desc(), cls.id.desc()).limit(limit)
+        return [cls._view(row, user_id) for row in query]
+
+    @classmethod
+    def count_states_by_user(cls, user_id: int) -> dict:
+        """Returns the number of relations of the user in each state."""
+        return dict(
+            cls.query.with_entities(cls.state, func.count(cls.id))
+            .filter(cls.involving_user(user_id))
+            .group_by(cls.state)
+            .all()
+        )
+
+    @classmethod
+    def has_accepted_relation(cls, user_id):
+        """Returns an EXISTS clause that is true when the user, given either as
+        an id or as a correlated column such as UserModel.id, is the mentor or
+        the mentee of an ACCEPTED relation."""
+        return cls.query.filter(
+            cls.state == MentorshipRelationState.ACCEPTED,
+            cls.involving_user(user_id),
+        ).exists()
+
+    @classmethod
+    def is_in_accepted_relation(cls, user_id: int) -> bool:
+        return db.session.query(cls.has_accepted_relation(user_id)).scalar()
+
     @classmethod
     def is_empty(cls) -> bool:
         return cls.query.first() is None
@@ -85,6 +261,31 @@ class MentorshipRelationModel(db.Model):
         db.session.add(self)
         db.session.commit()
 
+    def accept(self) -> bool:
+        """
+        Moves the relation to the ACCEPTED state. Returns False, leaving the
+        relation unchanged, when the mentor or the mentee has meanwhile been
+        accepted into another relation, in either role.
+        """
+
+        # a single conditional UPDATE claims both users, the row locks it takes
+        # make a concurrent accept involving either of them claim nothing
+        claimed = UserModel.query.filter(
+            UserModel.id.in_((self.mentor_id, self.mentee_id)),
+            UserModel.active_relation_id.is_(None),
+        ).update({UserModel.active_relation_id: self.id}, synchronize_session=False)
+        if claimed < 2:
+            db.session.rollback()
+            return False
+
+        self.state = MentorshipRelationState.ACCEPTED
+        try:
+            self.save_to_db()
+        except IntegrityError:
+            db.session.rollback()
+            return False
+        return True
+
     def delete_from_db(self) -> None:
         self.tasks_list.delete_from_db()
         db.session.delete(self)
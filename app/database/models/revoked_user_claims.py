@@ -0,0 +1,62 @@
+from sqlalchemy.exc import IntegrityError
+
+from app.database.sqlalchemy_extension import db
+
+
+class RevokedUserClaimsModel(db.Model):
+
+    # Specifying database table used for RevokedUserClaimsModel
+    __tablename__ = "revoked_user_claims"
+    __table_args__ = (
+        db.Index("ix_revoked_user_claims_expires_at", "expires_at"),
+        {"extend_existing": True},
+    )
+
+    # not a foreign key, the claims of a deleted user are revoked too
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    revoked_at = db.Column(db.Float, nullable=False)
+    expires_at = db.Column(db.Float, nullable=False)
+
+    def __init__(self, user_id, revoked_at, expires_at):
+
+        self.user_id = user_id
+        self.revoked_at = revoked_at
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"Claims of user {self.user_id} revoked at {self.revoked_at}"
+
+    @classmethod
+    def revoke(cls, user_id: int, revoked_at: float, expires_at: float) -> None:
+        """
+        Records that the claims of the user issued until revoked_at are
+        revoked, until expires_at, and drops the revocations which expired.
+        """
+
+        cls.query.filter(cls.expires_at < revoked_at).delete(synchronize_session=False)
+        values = {cls.revoked_at: revoked_at, cls.expires_at: expires_at}
+        revoked = cls.query.filter_by(user_id=user_id).update(
+            values, synchronize_session=False
+        )
+        if not revoked:
+            db.session.add(cls(user_id, revoked_at, expires_at))
+            try:
+                db.session.flush()
+            except IntegrityError:
+                # the claims were revoked meanwhile, by another request
+                db.session.rollback()
+                cls.query.filter_by(user_id=user_id).update(
+                    values, synchronize_session=False
+                )
+        db.session.commit()
+
+    @classmethod
+    def find_revoked_at(cls, user_id: int, now: float):
+        """Returns when the claims of the user were last revoked, if still in effect."""
+
+        revocation = (
+            cls.query.with_entities(cls.revoked_at)
+            .filter(cls.user_id == user_id, cls.expires_at >= now)
+            .first()
+        )
+        return None if revocation is None else revocation.revoked_at
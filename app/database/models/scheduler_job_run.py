@@ -0,0 +1,54 @@
+from app.database.sqlalchemy_extension import db
+
+
+class SchedulerJobRunModel(db.Model):
+
+    # Specifying database table used for SchedulerJobRunModel
+    __tablename__ = "scheduler_job_runs"
+    __table_args__ = (
+        db.Index("ix_scheduler_job_runs_job_id_started_at", "job_id", "started_at"),
+        db.Index("ix_scheduler_job_runs_started_at", "started_at"),
+        {"extend_existing": True},
+    )
+
+    ERROR_MAX_LENGTH = 500
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    job_id = db.Column(db.String(100), nullable=False)
+    started_at = db.Column(db.Float, nullable=False)
+    # in seconds
+    duration = db.Column(db.Float)
+    rows_affected = db.Column(db.Integer)
+    error = db.Column(db.String(ERROR_MAX_LENGTH))
+
+    def __init__(self, job_id, started_at):
+
+        self.job_id = job_id
+        self.started_at = started_at
+
+    def json(self):
+        return {
+            "id": self.id,
+            "job_id": self.job_id,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "rows_affected": self.rows_affected,
+            "error": self.error,
+        }
+
+    def __repr__(self):
+        return f"Run {self.id} of job {self.job_id} started at {self.started_at}"
+
+    @classmethod
+    def find_latest(cls, job_id: str = None, limit: int = 50) -> list:
+        """Returns the latest runs, of all the jobs or of the given one."""
+
+        query = cls.query
+        if job_id is not None:
+            query = query.filter_by(job_id=job_id)
+        return query.order_by(cls.started_at.desc()).limit(limit).all()
+
+    def save_to_db(self) -> None:
+        db.session.add(self)
+        db.session.commit()
@@ -0,0 +1,64 @@
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from app.database.sqlalchemy_extension import db
+
+
+class SchedulerLeaseModel(db.Model):
+
+    # Specifying database table used for SchedulerLeaseModel
+    __tablename__ = "scheduler_leases"
+    __table_args__ = {"extend_existing": True}
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.Float, nullable=False)
+
+    def __init__(self, name, holder, expires_at):
+
+        self.name = name
+        self.holder = holder
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"Lease {self.name} held by {self.holder} until {self.expires_at}"
+
+    @classmethod
+    def acquire(cls, name: str, holder: str, duration: float) -> bool:
+        """
+        Takes or renews the lease for duration seconds. Returns True if the
+        holder has the lease, which happens when the lease is free, expired or
+        already held by the holder. Since taking the lease is a single
+        conditional UPDATE, or INSERT when the lease doesn't exist yet, at most
+        one holder gets it.
+        """
+
+        now = time.time()
+        taken = (
+            cls.query.filter(
+                cls.name == name, or_(cls.holder == holder, cls.expires_at < now)
+            ).update(
+                {cls.holder: holder, cls.expires_at: now + duration},
+                synchronize_session=False,
+            )
+            > 0
+        )
+        if not taken and cls.query.filter_by(name=name).first() is None:
+            db.session.add(cls(name, holder, now + duration))
+            try:
+                db.session.flush()
+                taken = True
+            except IntegrityError:
+                # another holder created the lease meanwhile
+                db.session.rollback()
+                return False
+        db.session.commit()
+
+        return taken
+
+    @classmethod
+    def release(cls, name: str, holder: str) -> None:
+        cls.query.filter_by(name=name, holder=holder).delete(synchronize_session=False)
+        db.session.commit()
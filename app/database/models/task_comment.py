@@ -7,7 +7,12 @@ from app.database.sqlalchemy_extension import db
 class TaskCommentModel(db.Model):
 
     __tablename__ = "tasks_comments"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        db.Index("ix_tasks_comments_task_id_relation_id", "task_id", "relation_id"),
+        db.Index("ix_tasks_comments_relation_id", "relation_id"),
+        db.Index("ix_tasks_comments_user_id", "user_id"),
+        {"extend_existing": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
@@ -1,52 +1,115 @@
 from datetime import date
 from enum import Enum, unique
 
-from app.database.db_types.JsonCustomType import JsonCustomType
 from app.database.sqlalchemy_extension import db
 
 
+class TaskModel(db.Model):
+
+    # Specifying database table used for TaskModel
+    __tablename__ = "tasks"
+    __table_args__ = (
+        # completed tasks of the lists, newest first, i.e. the achievements
+        db.Index(
+            "ix_tasks_achievements",
+            "tasks_list_id",
+            "completed_at",
+            postgresql_where=db.text("is_done"),
+            sqlite_where=db.text("is_done"),
+        ),
+        db.Index("ix_tasks_completed_at", "completed_at"),
+        {"extend_existing": True},
+    )
+
+    # a task is identified by its id inside the tasks list
+    tasks_list_id = db.Column(
+        db.Integer, db.ForeignKey("tasks_list.id"), primary_key=True
+    )
+    task_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    description = db.Column(db.Text)
+    is_done = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.Float)
+    completed_at = db.Column(db.Float)
+
+    def __init__(
+        self,
+        task_id: int,
+        description: str,
+        created_at: date,
+        is_done=False,
+        completed_at=None,
+    ):
+
+        self.task_id = task_id
+        self.description = description
+        self.created_at = created_at
+        self.is_done = is_done
+        self.completed_at = completed_at
+
+    def json(self):
+
+        return {
+            TasksFields.ID.value: self.task_id,
+            TasksFields.DESCRIPTION.value: self.description,
+            TasksFields.IS_DONE.value: self.is_done,
+            TasksFields.CREATED_AT.value: self.created_at,
+            TasksFields.COMPLETED_AT.value: self.completed_at,
+        }
+
+    def __repr__(self):
+
+        return f"Task | tasks list id = {self.tasks_list_id}; id = {self.task_id}"
+
+
 class TasksListModel(db.Model):
 
     __tablename__ = "tasks_list"
     __table_args__ = {"extend_existing": True}
 
     id = db.Column(db.Integer, primary_key=True)
-    tasks = db.Column(JsonCustomType)
     next_task_id = db.Column(db.Integer)
 
+    task_rows = db.relationship(
+        TaskModel, order_by=TaskModel.task_id, cascade="all, delete-orphan"
+    )
+
     def __init__(self, tasks: "TasksListModel" = None):
 
         if tasks is None:
-            self.tasks = []
             self.next_task_id = 1
         else:
             if isinstance(tasks, list):
-                self.tasks = []
                 self.next_task_id = len(tasks) + 1
             else:
                 raise ValueError(TypeError)
 
+    @property
+    def tasks(self):
+        """The tasks of the list as dictionaries, ordered by id."""
+
+        return [task.json() for task in self.task_rows]
+
     def add_task(
         self, description: str, created_at: date, is_done=False, completed_at=None
     ) -> None:
 
-        task = {
-            TasksFields.ID.value: self.next_task_id,
-            TasksFields.DESCRIPTION.value: description,
-            TasksFields.IS_DONE.value: is_done,
-            TasksFields.CREATED_AT.value: created_at,
-            TasksFields.COMPLETED_AT.value: completed_at,
-        }
+        task = TaskModel(
+            task_id=self.next_task_id,
+            description=description,
+            created_at=created_at,
+            is_done=is_done,
+            completed_at=completed_at,
+        )
         self.next_task_id += 1
-        self.tasks = self.tasks + [task]
+        self.task_rows.append(task)
 
     def delete_task(self, task_id: int) -> None:
 
-        new_list = list(
-            filter(lambda task: task[TasksFields.ID.value] != task_id, self.tasks)
-        )
+        task = self.find_task_row_by_id(task_id)
+        if task is not None:
+            db.session.delete(task)
 
-        self.tasks = new_list
         self.save_to_db()
 
     def update_task(
@@ -57,40 +120,36 @@ class TasksListModel(db.Model):
         completed_at: date = None,
     ) -> None:
 
-        new_list = []
-        for task in self.tasks:
-            if task[TasksFields.ID.value] == task_id:
-                new_task = task.copy()
-                if description is not None:
-                    new_task[TasksFields.DESCRIPTION.value] = description
+        # only the row of this task is updated
+        task = self.find_task_row_by_id(task_id)
+        if task is not None:
+            if description is not None:
+                task.description = description
 
-                if is_done is not None:
-                    new_task[TasksFields.IS_DONE.value] = is_done
+            if is_done is not None:
+                task.is_done = is_done
 
-                if completed_at is not None:
-                    new_task[TasksFields.COMPLETED_AT.value] = completed_at
+            if completed_at is not None:
+                task.completed_at = completed_at
 
-                new_list = new_list + [new_task]
-                continue
+        self.save_to_db()
 
-            new_list = new_list + [task]
+    def find_task_row_by_id(self, task_id: int) -> TaskModel:
 
-        self.tasks = new_list
-        self.save_to_db()
+        # get() looks in the identity map before querying the database
+        return TaskModel.query.get((self.id, task_id))
 
     def find_task_by_id(self, task_id: int):
 
-        task = list(
-            filter(lambda task: task[TasksFields.ID.value] == task_id, self.tasks)
-        )
-        if len(task) == 0:
+        task = self.find_task_row_by_id(task_id)
+        if task is None:
             return None
         else:
-            return task[0]
+            return task.json()
 
     def is_empty(self) -> bool:
 
-        return len(self.tasks) == 0
+        return TaskModel.query.filter_by(tasks_list_id=self.id).first() is None
 
     def json(self):
 
@@ -9,7 +9,16 @@ class UserModel(db.Model):
 
     # Specifying database table used for UserModel
     __tablename__ = "users"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        db.Index(
+            "ix_users_is_email_verified_registration_date",
+            "is_email_verified",
+            "registration_date",
+        ),
+        db.Index("ix_users_is_admin", "is_admin"),
+        db.Index("ix_users_active_relation_id", "active_relation_id"),
+        {"extend_existing": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -50,6 +59,27 @@ class UserModel(db.Model):
     need_mentoring = db.Column(db.Boolean)
     available_to_mentor = db.Column(db.Boolean)
 
+    # the ACCEPTED mentorship relation of the user, claimed when it is accepted;
+    # not a foreign key, the relations already reference the users
+    active_relation_id = db.Column(db.Integer)
+
+    # columns shown to the other users, the only ones the listings select
+    PUBLIC_COLUMN_NAMES = (
+        "id",
+        "username",
+        "name",
+        "slack_username",
+        "bio",
+        "location",
+        "occupation",
+        "organization",
+        "interests",
+        "skills",
+        "need_mentoring",
+        "available_to_mentor",
+        "registration_date",
+    )
+
     def __init__(self, name, username, password, email, terms_and_conditions_checked):
         # required fields
 
@@ -114,6 +144,10 @@ class UserModel(db.Model):
     def find_by_id(cls, _id: int) -> "UserModel":
         return cls.query.filter_by(id=_id).first()
 
+    @classmethod
+    def public_columns(cls) -> list:
+        return [getattr(cls, name) for name in cls.PUBLIC_COLUMN_NAMES]
+
     @classmethod
     def get_all_admins(cls, is_admin=True):
         """Returns all the admins."""
@@ -123,6 +157,14 @@ class UserModel(db.Model):
     def is_empty(cls) -> bool:
         return cls.query.first() is None
 
+    @classmethod
+    def release_relations(cls, relation_ids) -> None:
+        """Frees the users of the given relations, which are no longer ACCEPTED,
+        to be accepted into another relation. Does not commit."""
+        cls.query.filter(cls.active_relation_id.in_(relation_ids)).update(
+            {cls.active_relation_id: None}, synchronize_session=False
+        )
+
     def set_password(self, password_plain_text: str) -> None:
         self.password_hash = generate_password_hash(password_plain_text, "sha256")
 
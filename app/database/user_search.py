@@ -0,0 +1,153 @@
+"""
+This module is used to define the backends of the users search.
+
+The search matches the query as a case insensitive substring of the user name
+or username. How that is served depends on the database:
+- PostgreSQL: "lower(column) LIKE '%query%'" served by pg_trgm GIN indexes
+- SQLite: an FTS5 table using the trigram tokenizer, kept in sync with the
+  users table by triggers
+- anything else: the plain LIKE condition
+"""
+import sqlite3
+
+from sqlalchemy import DDL, case, column, event, func, text
+
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+
+USERS_SEARCH_TABLE = "users_search"
+
+# FTS5 trigram tokenizer is available since SQLite 3.34.0
+FTS5_TRIGRAM_MIN_SQLITE_VERSION = (3, 34, 0)
+
+# trigram GIN indexes serve lower(column) LIKE '%query%'
+PG_TRGM_USERS_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm "
+    "ON users USING gin (lower(name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_username_trgm "
+    "ON users USING gin (lower(username) gin_trgm_ops)",
+]
+
+FTS5_USERS_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {USERS_SEARCH_TABLE} "
+    "USING fts5(name, username, content='users', content_rowid='id', "
+    "tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {USERS_SEARCH_TABLE}_insert "
+    "AFTER INSERT ON users BEGIN "
+    f"INSERT INTO {USERS_SEARCH_TABLE}(rowid, name, username) "
+    "VALUES (new.id, new.name, new.username); END",
+    f"CREATE TRIGGER IF NOT EXISTS {USERS_SEARCH_TABLE}_delete "
+    "AFTER DELETE ON users BEGIN "
+    f"INSERT INTO {USERS_SEARCH_TABLE}({USERS_SEARCH_TABLE}, rowid, name, username) "
+    "VALUES ('delete', old.id, old.name, old.username); END",
+    f"CREATE TRIGGER IF NOT EXISTS {USERS_SEARCH_TABLE}_update "
+    "AFTER UPDATE OF name, username ON users BEGIN "
+    f"INSERT INTO {USERS_SEARCH_TABLE}({USERS_SEARCH_TABLE}, rowid, name, username) "
+    "VALUES ('delete', old.id, old.name, old.username); "
+    f"INSERT INTO {USERS_SEARCH_TABLE}(rowid, name, username) "
+    "VALUES (new.id, new.name, new.username); END",
+    f"INSERT INTO {USERS_SEARCH_TABLE}({USERS_SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+
+def is_fts5_trigram_supported(*args, **kwargs) -> bool:
+    return sqlite3.sqlite_version_info >= FTS5_TRIGRAM_MIN_SQLITE_VERSION
+
+
+# the search tables and indexes are created with the users table, by
+# db.create_all, and by the add_user_search_indexes migration for existing
+# databases
+for statement in PG_TRGM_USERS_SEARCH_DDL:
+    event.listen(
+        UserModel.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+for statement in FTS5_USERS_SEARCH_DDL:
+    event.listen(
+        UserModel.__table__,
+        "after_create",
+        DDL(statement).execute_if(
+            dialect="sqlite", callable_=is_fts5_trigram_supported
+        ),
+    )
+
+event.listen(
+    UserModel.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {USERS_SEARCH_TABLE}").execute_if(dialect="sqlite"),
+)
+
+
+class LikeUserSearch:
+    """Substring search on lower(name) and lower(username)."""
+
+    def condition(self, search_query: str):
+        search_query = search_query.lower()
+        return func.lower(UserModel.name).contains(search_query) | func.lower(
+            UserModel.username
+        ).contains(search_query)
+
+    def rank(self, search_query: str):
+        """Returns an ORDER BY expression putting first the users whose name or
+        username starts with the query."""
+        search_query = search_query.lower()
+        return case(
+            [
+                (
+                    func.lower(UserModel.username).startswith(search_query)
+                    | func.lower(UserModel.name).startswith(search_query),
+                    0,
+                )
+            ],
+            else_=1,
+        )
+
+
+class Fts5UserSearch(LikeUserSearch):
+    """Substring search through the SQLite FTS5 trigram table."""
+
+    # the trigram tokenizer can't match queries shorter than a trigram
+    MIN_QUERY_LENGTH = 3
+
+    def condition(self, search_query: str):
+        if len(search_query) < self.MIN_QUERY_LENGTH:
+            return super().condition(search_query)
+
+        # quoted as a FTS5 string, so the query is matched literally
+        match = '"{}"'.format(search_query.replace('"', '""'))
+        return UserModel.id.in_(
+            text(
+                f"SELECT rowid FROM {USERS_SEARCH_TABLE} "
+                f"WHERE {USERS_SEARCH_TABLE} MATCH :users_search_match"
+            )
+            .bindparams(users_search_match=match)
+            .columns(column("rowid"))
+        )
+
+
+_search_backends = {}
+
+
+def get_user_search_backend():
+    """Returns the users search backend matching the app database."""
+
+    engine = db.engine
+    backend = _search_backends.get(engine)
+    if backend is not None:
+        return backend
+
+    if engine.dialect.name == "sqlite":
+        # databases created before the FTS5 table was introduced don't have it,
+        # so it's checked until found instead of being cached as missing
+        with engine.connect() as connection:
+            if not engine.dialect.has_table(connection, USERS_SEARCH_TABLE):
+                return LikeUserSearch()
+        backend = Fts5UserSearch()
+    else:
+        backend = LikeUserSearch()
+
+    _search_backends[engine] = backend
+    return backend
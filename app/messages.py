@@ -17,6 +17,8 @@ FIELD_AVAILABLE_TO_MENTOR_IS_INVALID = {
     "message": "Field available_to_mentor" " is not valid."
 }
 INVALID_INPUT = {"message": "Invalid input."}
+PAGINATION_CURSOR_IS_INVALID = {"message": "The pagination cursor is invalid."}
+SORT_FIELD_IS_INVALID = {"message": "The sort field is invalid."}
 PASSWORD_INPUT_BY_USER_HAS_INVALID_LENGTH = {
     "message": f"The password field has to be longer than {PASSWORD_MIN_LENGTH - 1} characters and shorter than {PASSWORD_MAX_LENGTH + 1} characters."
 }
@@ -1,43 +1,202 @@
+"""
+This module is used to run the scheduled jobs of the app.
+
+Every web process of the app, from its first request on, and every
+"flask scheduler run" process competes for a lease row in the database, and
+only the process holding the lease runs the scheduler, so the jobs run once
+even with many workers on many nodes. Other commands, e.g. "flask db
+upgrade", stay out of the election. The lease is renewed every
+SCHEDULER_LEASE_RENEW_INTERVAL seconds and is taken over by another process
+when its holder stops renewing it for SCHEDULER_LEASE_DURATION seconds.
+Setting SCHEDULER_ENABLED to False keeps the API processes out of the
+election, the jobs are then run by a dedicated "flask scheduler run" process.
+
+The jobs are stored in the database, so their next run time survives the
+restarts, and each run is recorded in the scheduler_job_runs table.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from flask.cli import AppGroup
 
 import config
+from app.database.models.scheduler_job_run import SchedulerJobRunModel  # noqa: F401
+from app.database.models.scheduler_lease import SchedulerLeaseModel
 from app.schedulers.complete_mentorship_cron_job import (
+    COMPLETE_RELATIONS_JOB_ID,
     complete_overdue_mentorship_relations_job,
 )
-from app.schedulers.delete_unverified_users_cron_job import delete_unverified_users_job
+from app.schedulers.delete_unverified_users_cron_job import (
+    DELETE_UNVERIFIED_USERS_JOB_ID,
+    delete_unverified_users_job,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LEASE_NAME = "background_scheduler"
+SCHEDULER_JOBS_TABLE = "scheduler_jobs"
 
 scheduler = BackgroundScheduler()
 
+scheduler_cli = AppGroup("scheduler", help="Run the scheduled jobs.")
+
 
 def init_schedulers():
+    if not scheduler.running:
+        # the stored jobs are updated before any of them runs
+        scheduler.start(paused=True)
     init_complete_relation_scheduler()
     init_delete_unverified_users_scheduler()
-    if not scheduler.running:
-        scheduler.start()
+    scheduler.resume()
+
+
+def schedule_job(job_id, func, trigger):
+    """
+    Adds the job to the job store if it isn't there yet. A stored job keeps
+    its next run time, so a run missed while no process held the lease is
+    still done, unless its trigger changed.
+    """
+
+    job = scheduler.get_job(job_id)
+    if job is None:
+        scheduler.add_job(func, trigger, id=job_id)
+    elif str(job.trigger) != str(trigger):
+        scheduler.reschedule_job(job_id, trigger=trigger)
 
 
 def init_complete_relation_scheduler():
 
-    scheduler.add_job(
-        id="complete_mentorship_relations_cron",
-        func=complete_overdue_mentorship_relations_job,
-        trigger="cron",
-        hour=23,
-        minute=59,
-        second=0,
-        day="*",
-        timezone="Etc/UTC",
-        replace_existing=True,
+    schedule_job(
+        COMPLETE_RELATIONS_JOB_ID,
+        complete_overdue_mentorship_relations_job,
+        CronTrigger(hour=23, minute=59, second=0, day="*", timezone="Etc/UTC"),
     )
 
 
 def init_delete_unverified_users_scheduler():
     threshold_days = config.BaseConfig.UNVERIFIED_USER_THRESHOLD // 86400
 
-    scheduler.add_job(
-        id="delete_unverified_users_cron",
-        func=delete_unverified_users_job,
-        trigger="cron",
-        day=threshold_days,
-        replace_existing=True,
+    schedule_job(
+        DELETE_UNVERIFIED_USERS_JOB_ID,
+        delete_unverified_users_job,
+        CronTrigger(day=threshold_days),
     )
+
+
+class SchedulerLeader:
+    def __init__(self):
+        self.app = None
+        self.is_leader = False
+        self._holder = None
+        self._holder_pid = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.app = app
+        app.cli.add_command(scheduler_cli)
+
+        if not scheduler.running:
+            # missed runs are done once, when a process takes the lease again
+            scheduler.configure(
+                jobstores={
+                    "default": SQLAlchemyJobStore(
+                        url=app.config["SQLALCHEMY_DATABASE_URI"],
+                        tablename=SCHEDULER_JOBS_TABLE,
+                    )
+                },
+                job_defaults={
+                    "coalesce": True,
+                    "max_instances": 1,
+                    "misfire_grace_time": app.config["SCHEDULER_MISFIRE_GRACE_TIME"],
+                },
+            )
+
+        # only processes serving requests join the election
+        if app.config["SCHEDULER_ENABLED"]:
+            app.before_first_request(self.start)
+
+    @property
+    def holder(self) -> str:
+        # a forked worker must not share the lease of its parent process
+        if self._holder_pid != os.getpid():
+            self._holder_pid = os.getpid()
+            self._holder = (
+                f"{socket.gethostname()}:{self._holder_pid}:{uuid.uuid4().hex[:8]}"
+            )
+        return self._holder
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self.run, name="scheduler-leader", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self):
+        while self._thread is not None and self._thread.is_alive():
+            self._thread.join(1)
+
+    def elect(self):
+        """Takes or renews the lease, then starts or pauses the scheduler."""
+
+        try:
+            with self.app.app_context():
+                is_leader = SchedulerLeaseModel.acquire(
+                    SCHEDULER_LEASE_NAME,
+                    self.holder,
+                    self.app.config["SCHEDULER_LEASE_DURATION"],
+                )
+        except Exception:
+            logger.exception("Could not renew the scheduler lease")
+            is_leader = False
+
+        if is_leader and not self.is_leader:
+            logger.info("Starting the scheduler in %s", self.holder)
+            init_schedulers()
+        elif not is_leader and self.is_leader:
+            logger.info("Pausing the scheduler in %s", self.holder)
+            scheduler.pause()
+        self.is_leader = is_leader
+
+    def resign(self):
+        if not self.is_leader:
+            return
+
+        scheduler.pause()
+        self.is_leader = False
+        try:
+            with self.app.app_context():
+                SchedulerLeaseModel.release(SCHEDULER_LEASE_NAME, self.holder)
+        except Exception:
+            logger.exception("Could not release the scheduler lease")
+
+    def run(self):
+        while not self._stop.is_set():
+            self.elect()
+            self._stop.wait(self.app.config["SCHEDULER_LEASE_RENEW_INTERVAL"])
+        self.resign()
+
+
+scheduler_leader = SchedulerLeader()
+
+
+@scheduler_cli.command("run")
+def run_scheduler():
+    """Runs the scheduled jobs, when holding the lease, until stopped."""
+    scheduler_leader.start()
+    try:
+        scheduler_leader.join()
+    except KeyboardInterrupt:
+        scheduler_leader.stop()
+        scheduler_leader.join()
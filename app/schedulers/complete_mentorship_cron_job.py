@@ -1,27 +1,92 @@
 from datetime import datetime
+from itertools import chain
 
+from app.schedulers.job_history import record_job_run
 
-def complete_overdue_mentorship_relations_job():
+COMPLETE_RELATIONS_JOB_ID = "complete_mentorship_relations_cron"
+
+
+def complete_overdue_mentorship_relations(now: float, batch_size: int) -> list:
     """
-    This function iterates of all the mentorship requests and
-    checks if the end date of the relation has passed the current date
-    and is in the ACCEPTED state
-    if True then marks the relation as COMPLETED, if False does nothing
+    This function marks the ACCEPTED mentorship relations whose end date
+    has passed as COMPLETED, batch_size relations per UPDATE statement and
+    transaction. It has to be called within an app context and returns the
+    ids of the completed relations.
     """
-    from run import application
 
-    with application.app_context():
-        from app.database.models.mentorship_relation import MentorshipRelationModel
-        from app.utils.enum_utils import MentorshipRelationState
+    from app.database.cache_invalidation import collect_users_changed_in_bulk
+    from app.database.models.mentorship_relation import MentorshipRelationModel
+    from app.database.models.user import UserModel
+    from app.database.sqlalchemy_extension import db
+    from app.utils.enum_utils import MentorshipRelationState
+
+    is_overdue = (
+        MentorshipRelationModel.state == MentorshipRelationState.ACCEPTED,
+        MentorshipRelationModel.end_date < now,
+    )
+
+    completed_ids = []
+    while True:
+        batch = (
+            MentorshipRelationModel.query.with_entities(
+                MentorshipRelationModel.id,
+                MentorshipRelationModel.mentor_id,
+                MentorshipRelationModel.mentee_id,
+            )
+            .filter(*is_overdue)
+            .order_by(MentorshipRelationModel.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return completed_ids
+
+        batch_ids = [relation_id for relation_id, _, _ in batch]
+        # the state is checked again, a relation may have changed meanwhile
+        completed_count = MentorshipRelationModel.query.filter(
+            MentorshipRelationModel.id.in_(batch_ids), *is_overdue
+        ).update(
+            {MentorshipRelationModel.state: MentorshipRelationState.COMPLETED},
+            synchronize_session=False,
+        )
+        if completed_count < len(batch):
+            batch_completed_ids = {
+                relation.id
+                for relation in MentorshipRelationModel.query.with_entities(
+                    MentorshipRelationModel.id
+                ).filter(
+                    MentorshipRelationModel.id.in_(batch_ids),
+                    MentorshipRelationModel.state == MentorshipRelationState.COMPLETED,
+                )
+            }
+            batch = [
+                relation for relation in batch if relation[0] in batch_completed_ids
+            ]
 
-        all_relations = filter(
-            lambda relation: relation.state == MentorshipRelationState.ACCEPTED
-            and relation.end_date < current_date_timestamp,
-            MentorshipRelationModel.query.all(),
+        UserModel.release_relations([relation_id for relation_id, _, _ in batch])
+        user_ids = chain.from_iterable(
+            (mentor_id, mentee_id) for _, mentor_id, mentee_id in batch
         )
+        collect_users_changed_in_bulk(db.session, user_ids)
+        db.session.commit()
 
-        current_date_timestamp = datetime.utcnow().timestamp()
+        completed_ids.extend(relation_id for relation_id, _, _ in batch)
+
+
+def complete_overdue_mentorship_relations_job():
+    """
+    This function completes the mentorship relations which are ACCEPTED
+    and whose end date has passed the current date
+    """
+    from run import application
+
+    with application.app_context(), record_job_run(
+        COMPLETE_RELATIONS_JOB_ID
+    ) as job_run:
+        completed_ids = complete_overdue_mentorship_relations(
+            datetime.utcnow().timestamp(),
+            application.config["SCHEDULER_JOBS_BATCH_SIZE"],
+        )
+        job_run.rows_affected = len(completed_ids)
 
-        for relation in all_relations:
-            relation.state = MentorshipRelationState.COMPLETED
-            relation.save_to_db()
+    return completed_ids
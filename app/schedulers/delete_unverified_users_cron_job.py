@@ -1,27 +1,124 @@
 import time
 
-import config
+from sqlalchemy import not_, or_
+
+from app.schedulers.job_history import record_job_run
+
+DELETE_UNVERIFIED_USERS_JOB_ID = "delete_unverified_users_cron"
+
+
+def delete_unverified_users(registered_before: float, batch_size: int) -> dict:
+    """
+    This function deletes the users who registered before the given time
+    and haven't verified their email, together with the mentorship relations
+    they are part of and the tasks of these relations. The users are deleted
+    batch_size at a time, with one transaction per batch. It has to be called
+    within an app context and returns the number of deleted rows per kind.
+    """
+
+    from app.database.cache_invalidation import collect_users_changed_in_bulk
+    from app.database.models.mentorship_relation import MentorshipRelationModel
+    from app.database.models.task_comment import TaskCommentModel
+    from app.database.models.tasks_list import TaskModel, TasksListModel
+    from app.database.models.user import UserModel
+    from app.database.sqlalchemy_extension import db
+
+    deleted = {"users": 0, "mentorship_relations": 0, "tasks_lists": 0}
+    while True:
+        user_ids = [
+            user.id
+            for user in UserModel.query.with_entities(UserModel.id)
+            .filter(
+                not_(UserModel.is_email_verified),
+                UserModel.registration_date < registered_before,
+            )
+            .order_by(UserModel.id)
+            .limit(batch_size)
+        ]
+        if not user_ids:
+            return deleted
+
+        relations = MentorshipRelationModel.query.with_entities(
+            MentorshipRelationModel.id,
+            MentorshipRelationModel.tasks_list_id,
+            MentorshipRelationModel.mentor_id,
+            MentorshipRelationModel.mentee_id,
+        ).filter(
+            or_(
+                MentorshipRelationModel.mentor_id.in_(user_ids),
+                MentorshipRelationModel.mentee_id.in_(user_ids),
+            )
+        )
+        relation_ids = []
+        tasks_list_ids = []
+        partner_ids = set(user_ids)
+        for relation_id, tasks_list_id, mentor_id, mentee_id in relations:
+            relation_ids.append(relation_id)
+            if tasks_list_id is not None:
+                tasks_list_ids.append(tasks_list_id)
+            partner_ids.update((mentor_id, mentee_id))
+
+        comment_filters = [TaskCommentModel.user_id.in_(user_ids)]
+        if relation_ids:
+            comment_filters.append(TaskCommentModel.relation_id.in_(relation_ids))
+        TaskCommentModel.query.filter(or_(*comment_filters)).delete(
+            synchronize_session=False
+        )
+        if relation_ids:
+            MentorshipRelationModel.query.filter(
+                MentorshipRelationModel.id.in_(relation_ids)
+            ).delete(synchronize_session=False)
+            UserModel.release_relations(relation_ids)
+        if tasks_list_ids:
+            TaskModel.query.filter(TaskModel.tasks_list_id.in_(tasks_list_ids)).delete(
+                synchronize_session=False
+            )
+            # tasks_comments.task_id holds the id of a task but its foreign key
+            # references tasks_list.id, so the tasks lists whose id matches the
+            # task of a comment of another relation are kept, to keep the comment
+            kept_tasks_list_ids = {
+                comment.task_id
+                for comment in TaskCommentModel.query.with_entities(
+                    TaskCommentModel.task_id
+                )
+                .filter(TaskCommentModel.task_id.in_(tasks_list_ids))
+                .distinct()
+            }
+            tasks_list_ids = [
+                tasks_list_id
+                for tasks_list_id in tasks_list_ids
+                if tasks_list_id not in kept_tasks_list_ids
+            ]
+        if tasks_list_ids:
+            TasksListModel.query.filter(TasksListModel.id.in_(tasks_list_ids)).delete(
+                synchronize_session=False
+            )
+        UserModel.query.filter(UserModel.id.in_(user_ids)).delete(
+            synchronize_session=False
+        )
+        collect_users_changed_in_bulk(db.session, partner_ids)
+        db.session.commit()
+
+        deleted["users"] += len(user_ids)
+        deleted["mentorship_relations"] += len(relation_ids)
+        deleted["tasks_lists"] += len(tasks_list_ids)
 
 
 def delete_unverified_users_job():
     """
-    This function iterates of all the users and
-    checks if the email is verified. If email is not verified
-    then we are checking whether the specified threshold has passed
-    since registration. If yes, user is deleted from the database.
+    This function deletes the users who haven't verified their email
+    within UNVERIFIED_USER_THRESHOLD seconds of their registration
     """
 
     from run import application
 
-    with application.app_context():
-        from app.database.models.user import UserModel
-
-        unverified_users = list(
-            UserModel.query.filter_by(is_email_verified=False).all()
+    with application.app_context(), record_job_run(
+        DELETE_UNVERIFIED_USERS_JOB_ID
+    ) as job_run:
+        deleted = delete_unverified_users(
+            time.time() - application.config["UNVERIFIED_USER_THRESHOLD"],
+            application.config["SCHEDULER_JOBS_BATCH_SIZE"],
         )
-        threshold = config.BaseConfig.UNVERIFIED_USER_THRESHOLD
-        for user in unverified_users:
-            delta = time.time() - user.registration_date
+        job_run.rows_affected = sum(deleted.values())
 
-            if delta > threshold:
-                user.delete_from_db()
+    return deleted
@@ -0,0 +1,121 @@
+"""
+This module is used to send the emails queued in the email outbox.
+
+The API only adds emails to the outbox, a background thread of each web
+process, started with its first request, or a dedicated process started
+with "flask email-outbox run", drains it in batches. Other commands, e.g.
+"flask db upgrade", don't start it. Failed emails are retried with an
+exponential backoff and are moved to the DEAD state after
+EMAIL_OUTBOX_MAX_ATTEMPTS, emails whose worker didn't report back count
+as failed attempts too.
+"""
+import logging
+import threading
+
+import click
+from flask.cli import AppGroup
+
+# imported with the app so db.create_all creates the email_outbox table
+from app.database.models.email_outbox import EmailOutboxModel
+
+logger = logging.getLogger(__name__)
+
+email_outbox_cli = AppGroup("email-outbox", help="Send the queued emails.")
+
+
+def drain_email_outbox(app) -> int:
+    """
+    This function sends one batch of due emails, it has to be called
+    within an app context. Returns the number of emails handled.
+    """
+
+    from app.api.email_utils import deliver_outbox_emails
+    from app.database.sqlalchemy_extension import db
+
+    emails = EmailOutboxModel.claim_batch(
+        app.config["EMAIL_OUTBOX_BATCH_SIZE"],
+        app.config["EMAIL_OUTBOX_CLAIM_TIMEOUT"],
+        app.config["EMAIL_OUTBOX_MAX_ATTEMPTS"],
+    )
+    if not emails:
+        return 0
+
+    try:
+        failures = deliver_outbox_emails(emails)
+    except Exception as error:
+        # e.g. the connection to the mail server couldn't be opened
+        logger.exception("Could not deliver the email outbox batch")
+        failures = {email.id: str(error) for email in emails}
+
+    for email in emails:
+        if email.id in failures:
+            email.mark_failed(
+                failures[email.id],
+                app.config["EMAIL_OUTBOX_MAX_ATTEMPTS"],
+                app.config["EMAIL_OUTBOX_RETRY_DELAY"],
+            )
+        else:
+            email.mark_sent()
+    db.session.commit()
+
+    return len(emails)
+
+
+class EmailOutboxWorker:
+    def __init__(self):
+        self.app = None
+        self._wake_up = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.app = app
+        app.cli.add_command(email_outbox_cli)
+
+        # only processes serving requests send in the background
+        if app.config["EMAIL_OUTBOX_WORKER_ENABLED"]:
+            app.before_first_request(self.start)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self.run, name="email-outbox-worker", daemon=True
+            )
+            self._thread.start()
+
+    def notify(self):
+        """Wakes the worker up, e.g. when an email was queued."""
+        self._wake_up.set()
+
+    def drain(self) -> int:
+        handled = 0
+        with self.app.app_context():
+            batch_size = drain_email_outbox(self.app)
+            while batch_size:
+                handled += batch_size
+                batch_size = drain_email_outbox(self.app)
+        return handled
+
+    def run(self):
+        while True:
+            self._wake_up.wait(self.app.config["EMAIL_OUTBOX_POLL_INTERVAL"])
+            self._wake_up.clear()
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Email outbox worker failed to drain the outbox")
+
+
+email_outbox_worker = EmailOutboxWorker()
+
+
+@email_outbox_cli.command("run")
+def run_email_outbox_worker():
+    """Sends the queued emails until stopped."""
+    email_outbox_worker.run()
+
+
+@email_outbox_cli.command("drain")
+def drain_email_outbox_command():
+    """Sends all the emails which are due and exits."""
+    handled = email_outbox_worker.drain()
+    click.echo(f"{handled} emails handled")
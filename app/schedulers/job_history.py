@@ -0,0 +1,36 @@
+"""
+This module is used to record the runs of the scheduled jobs.
+"""
+import time
+from contextlib import contextmanager
+
+
+class JobRun:
+    def __init__(self):
+        self.rows_affected = None
+
+
+@contextmanager
+def record_job_run(job_id: str):
+    """
+    Records the duration of the job run within the block, the rows_affected
+    set on the yielded JobRun, and the error raised by the block if any. It
+    has to be used within an app context.
+    """
+
+    from app.database.models.scheduler_job_run import SchedulerJobRunModel
+    from app.database.sqlalchemy_extension import db
+
+    job_run = JobRun()
+    job_run_record = SchedulerJobRunModel(job_id, time.time())
+    start = time.monotonic()
+    try:
+        yield job_run
+    except Exception as error:
+        db.session.rollback()
+        job_run_record.error = repr(error)[: SchedulerJobRunModel.ERROR_MAX_LENGTH]
+        raise
+    finally:
+        job_run_record.duration = time.monotonic() - start
+        job_run_record.rows_affected = job_run.rows_affected
+        job_run_record.save_to_db()
@@ -0,0 +1,60 @@
+"""
+This module is used to handle the user claims carried by the access tokens.
+
+The admin status and the email verification of the user are signed into the
+access token when it is created, so protected endpoints can trust them for
+the token lifetime instead of querying the user. A verified email stays
+verified, but the admin status can be taken away: revoke_user_claims records
+when, in the database so every worker of the app sees it, and is_admin_user
+checks it before trusting an admin claim. Only that privileged path pays for
+the lookup, not every request.
+"""
+import time
+
+from flask import current_app, has_request_context
+from flask_jwt_extended import get_jwt_claims, get_jwt_identity, get_raw_jwt
+
+from app.database.models.revoked_user_claims import RevokedUserClaimsModel
+
+ADMIN_CLAIM = "is_admin"
+EMAIL_VERIFIED_CLAIM = "is_email_verified"
+
+
+def build_user_claims(user) -> dict:
+    return {
+        ADMIN_CLAIM: bool(user.is_admin),
+        EMAIL_VERIFIED_CLAIM: bool(user.is_email_verified),
+    }
+
+
+def get_token_claim(user_id: int, claim: str):
+    """
+    Returns the claim of the access token of the current request, or None
+    if the request isn't authenticated as the given user
+    """
+
+    if not has_request_context() or get_jwt_identity() != user_id:
+        return None
+
+    return get_jwt_claims().get(claim, None)
+
+
+def revoke_user_claims(user_id: int) -> None:
+    """Stops trusting the access tokens issued to the user until now."""
+
+    now = time.time()
+    # no access token issued before now outlives its expiration time
+    expires_at = now + current_app.config["JWT_ACCESS_TOKEN_EXPIRES"].total_seconds()
+    RevokedUserClaimsModel.revoke(user_id, now, expires_at)
+
+
+def are_token_claims_revoked(user_id: int) -> bool:
+    """
+    Returns whether the claims of the user were revoked since the access
+    token of the current request was issued
+    """
+
+    revoked_at = RevokedUserClaimsModel.find_revoked_at(user_id, time.time())
+    # iat is in whole seconds, so a token issued within the second of the
+    # revocation is revoked too
+    return revoked_at is not None and get_raw_jwt()["iat"] <= revoked_at
@@ -3,8 +3,69 @@ This module is used to define decorators for the app
 """
 from http import HTTPStatus
 
+from flask import g, has_app_context
+
 from app import messages
+from app.api.cache_extension import MemoryCacheBackend
 from app.database.models.user import UserModel
+from app.utils.claims_utils import (
+    ADMIN_CLAIM,
+    EMAIL_VERIFIED_CLAIM,
+    are_token_claims_revoked,
+    get_token_claim,
+)
+
+# users known to have verified their email, kept for a short time across
+# requests; a verified email never becomes unverified, so only deleting the
+# user has to drop an entry, and the DAO functions handle a deleted user
+EMAIL_VERIFIED_CACHE_TTL = 60
+EMAIL_VERIFIED_CACHE_MAX_ENTRIES = 10000
+email_verified_cache = MemoryCacheBackend(EMAIL_VERIFIED_CACHE_MAX_ENTRIES)
+
+
+def find_request_user(user_id: int) -> "UserModel":
+    """
+    This function loads a user at most once per request, the user is kept
+    in flask.g and handed to every later call with the same id, e.g. the DAO
+    functions decorated with email_verification_required
+    """
+
+    if not has_app_context():
+        return UserModel.find_by_id(user_id)
+
+    request_users = g.setdefault("request_users", {})
+    if user_id not in request_users:
+        request_users[user_id] = UserModel.find_by_id(user_id)
+
+    return request_users[user_id]
+
+
+def is_admin_user(user_id: int) -> bool:
+    """
+    This function checks if the user is an admin, trusting the claim of the
+    access token when the request is authenticated as this user, unless the
+    admin status was revoked since the token was issued
+    """
+
+    is_admin = get_token_claim(user_id, ADMIN_CLAIM)
+    if is_admin and are_token_claims_revoked(user_id):
+        is_admin = None
+    if is_admin is None:
+        user = find_request_user(user_id)
+        is_admin = bool(user and user.is_admin)
+
+    return is_admin
+
+
+def invalidate_request_user(user_id: int) -> None:
+    """
+    This function drops what is known about the user, it has to be called
+    when the email verification of the user changes or the user is deleted
+    """
+
+    email_verified_cache.delete_many([user_id])
+    if has_app_context():
+        g.setdefault("request_users", {}).pop(user_id, None)
 
 
 def email_verification_required(user_function):
@@ -28,10 +89,18 @@ def email_verification_required(user_function):
         - dict
         """
 
-        if kwargs:
-            user = UserModel.find_by_id(kwargs["user_id"])
+        if "user_id" in kwargs:
+            user_id = kwargs["user_id"]
         else:
-            user = UserModel.find_by_id(args[0])
+            user_id = args[0]
+
+        # the claim of the user's own access token is trusted
+        is_email_verified = get_token_claim(user_id, EMAIL_VERIFIED_CLAIM)
+        if is_email_verified or email_verified_cache.get(user_id):
+            return user_function(*args, **kwargs)
+
+        # loaded once per request, the DAO functions reuse it
+        user = find_request_user(user_id)
 
         # verify if user exists
         if user:
@@ -40,6 +109,7 @@ def email_verification_required(user_function):
                     messages.USER_HAS_NOT_VERIFIED_EMAIL_BEFORE_LOGIN,
                     HTTPStatus.FORBIDDEN,
                 )
+            email_verified_cache.set(user_id, True, EMAIL_VERIFIED_CACHE_TTL)
             return user_function(*args, **kwargs)
         else:
             return messages.USER_DOES_NOT_EXIST, HTTPStatus.NOT_FOUND
@@ -0,0 +1,45 @@
+"""This module is used to build and read the opaque cursors returned by the
+keyset (cursor) paginated listings.
+
+A cursor holds the sort key values of the last row of a page. The next page is
+then fetched with a "WHERE key > :last_key" condition on an indexed column,
+so it costs the same no matter how deep into the listing the client is.
+"""
+import base64
+import binascii
+import json
+
+
+def encode_cursor(*values):
+    """Encodes the sort key values of the last row of a page into a cursor.
+
+    Args:
+        values: JSON serializable sort key values, e.g. the id of the last row.
+
+    Return:
+        An url safe string which is opaque to the client.
+    """
+    payload = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, number_of_values=1):
+    """Decodes a cursor created by encode_cursor.
+
+    Args:
+        cursor: string received from the client.
+        number_of_values: number of sort key values the cursor must hold.
+
+    Return:
+        A list with the sort key values, or None if the cursor is malformed.
+    """
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+    if not isinstance(values, list) or len(values) != number_of_values:
+        return None
+
+    return values
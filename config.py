@@ -44,6 +44,10 @@ class BaseConfig(object):
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(weeks=4)
 
     SECRET_KEY = os.getenv("SECRET_KEY", None)
+    # previous secret keys, comma separated, still accepted for confirmation tokens
+    OLD_SECRET_KEYS = [
+        key for key in os.getenv("OLD_SECRET_KEYS", "").split(",") if key.strip()
+    ]
 
     SECURITY_PASSWORD_SALT = os.getenv("SECURITY_PASSWORD_SALT")
 
@@ -64,6 +68,39 @@ class BaseConfig(object):
 
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
 
+    # connections to the mail server kept open and reused, in seconds
+    MAIL_POOL_SIZE = 2
+    MAIL_POOL_IDLE_TIMEOUT = 120
+    MAIL_POOL_HEALTH_CHECK_AFTER = 15
+
+    # emails are queued in the outbox and sent by a background worker
+    EMAIL_OUTBOX_WORKER_ENABLED = True
+    EMAIL_OUTBOX_BATCH_SIZE = 50
+    EMAIL_OUTBOX_POLL_INTERVAL = 10
+    EMAIL_OUTBOX_MAX_ATTEMPTS = 6
+    # seconds before the first retry, doubled after each failed attempt
+    EMAIL_OUTBOX_RETRY_DELAY = 30
+    EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
+
+    # rows changed per transaction by the scheduled jobs
+    SCHEDULER_JOBS_BATCH_SIZE = 1000
+
+    # the scheduled jobs run in the one process holding the scheduler lease,
+    # disabled in the API processes when "flask scheduler run" is used instead
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_LEASE_DURATION = 60
+    SCHEDULER_LEASE_RENEW_INTERVAL = 20
+    # seconds after which a missed run of a scheduled job is skipped
+    SCHEDULER_MISFIRE_GRACE_TIME = 86400
+
+    # per user cache of the dashboard and home statistics responses; "memory"
+    # is only invalidated in the process making the change, so it is meant for
+    # single process deployments, several workers need "redis"
+    USER_CACHE_BACKEND = os.getenv("USER_CACHE_BACKEND", "null")
+    USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    USER_CACHE_TTL = 300
+    USER_CACHE_MAX_ENTRIES = 10000
+
     @staticmethod
     def build_db_uri(
         db_type_arg=DB_TYPE,
@@ -118,8 +155,12 @@ class TestingConfig(BaseConfig):
 
     TESTING = True
     MOCK_EMAIL = True
+    USER_CACHE_BACKEND = "null"
+    EMAIL_OUTBOX_WORKER_ENABLED = False
+    SCHEDULER_ENABLED = False
 
-    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    # the tests run on SQLite unless given another database, e.g. PostgreSQL
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URI", "sqlite://")
 
 
 def get_env_config() -> str:
@@ -0,0 +1,50 @@
+"""add scheduler job runs
+
+Revision ID: 2225b1490034
+Revises: 35a42a793afd
+Create Date: 2026-10-18 14:48:11.203517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2225b1490034"
+down_revision = "35a42a793afd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the table is already there when db.create_all built the database
+    if "scheduler_job_runs" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "scheduler_job_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.String(length=100), nullable=False),
+        sa.Column("started_at", sa.Float(), nullable=False),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column("rows_affected", sa.Integer(), nullable=True),
+        sa.Column("error", sa.String(length=500), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scheduler_job_runs_job_id_started_at",
+        "scheduler_job_runs",
+        ["job_id", "started_at"],
+    )
+    op.create_index(
+        "ix_scheduler_job_runs_started_at", "scheduler_job_runs", ["started_at"]
+    )
+    # the scheduler_jobs table is created by the APScheduler job store itself
+
+
+def downgrade():
+    op.drop_index("ix_scheduler_job_runs_started_at", table_name="scheduler_job_runs")
+    op.drop_index(
+        "ix_scheduler_job_runs_job_id_started_at", table_name="scheduler_job_runs"
+    )
+    op.drop_table("scheduler_job_runs")
@@ -0,0 +1,34 @@
+"""add scheduler leases
+
+Revision ID: 35a42a793afd
+Revises: 5e09c07b6e45
+Create Date: 2026-10-18 14:02:37.518244
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "35a42a793afd"
+down_revision = "5e09c07b6e45"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the table is already there when db.create_all built the database
+    if "scheduler_leases" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "scheduler_leases",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("holder", sa.String(length=100), nullable=False),
+        sa.Column("expires_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade():
+    op.drop_table("scheduler_leases")
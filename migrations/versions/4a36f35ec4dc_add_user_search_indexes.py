@@ -0,0 +1,52 @@
+"""add user search indexes
+
+Revision ID: 4a36f35ec4dc
+Revises:
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4a36f35ec4dc"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # on a new database the users table, with its search indexes, is created
+    # by db.create_all
+    if "users" not in sa.inspect(bind).get_table_names():
+        return
+
+    if bind.dialect.name == "postgresql":
+        from app.database.user_search import PG_TRGM_USERS_SEARCH_DDL
+
+        for statement in PG_TRGM_USERS_SEARCH_DDL:
+            op.execute(statement)
+    elif bind.dialect.name == "sqlite":
+        from app.database.user_search import (
+            FTS5_USERS_SEARCH_DDL,
+            is_fts5_trigram_supported,
+        )
+
+        if is_fts5_trigram_supported():
+            for statement in FTS5_USERS_SEARCH_DDL:
+                op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_users_username_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_users_name_trgm")
+    elif dialect == "sqlite":
+        for trigger in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER IF EXISTS users_search_{trigger}")
+        op.execute("DROP TABLE IF EXISTS users_search")
@@ -0,0 +1,56 @@
+"""add email outbox
+
+Revision ID: 5e09c07b6e45
+Revises: 6fcf9f606edc
+Create Date: 2026-10-18 11:26:08.774120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5e09c07b6e45"
+down_revision = "6fcf9f606edc"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the table is already there when db.create_all built the database
+    if "email_outbox" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("recipient", sa.String(length=254), nullable=False),
+        sa.Column("subject", sa.String(length=200), nullable=False),
+        sa.Column("html", sa.Text(), nullable=False),
+        sa.Column(
+            "state",
+            sa.Enum("PENDING", "SENDING", "SENT", "DEAD", name="emailoutboxstate"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.Float(), nullable=False),
+        sa.Column("last_error", sa.String(length=500), nullable=True),
+        sa.Column("claimed_by", sa.String(length=32), nullable=True),
+        sa.Column("claimed_at", sa.Float(), nullable=True),
+        sa.Column("creation_date", sa.Float(), nullable=False),
+        sa.Column("sent_date", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_email_outbox_state_next_attempt_at",
+        "email_outbox",
+        ["state", "next_attempt_at"],
+    )
+    op.create_index("ix_email_outbox_claimed_by", "email_outbox", ["claimed_by"])
+
+
+def downgrade():
+    op.drop_index("ix_email_outbox_claimed_by", table_name="email_outbox")
+    op.drop_index("ix_email_outbox_state_next_attempt_at", table_name="email_outbox")
+    op.drop_table("email_outbox")
+    sa.Enum(name="emailoutboxstate").drop(op.get_bind(), checkfirst=True)
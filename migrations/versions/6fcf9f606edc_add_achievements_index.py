@@ -0,0 +1,41 @@
+"""add partial index on completed tasks for achievements
+
+Revision ID: 6fcf9f606edc
+Revises: 7a5fe1bc504b
+Create Date: 2026-10-18 10:41:53.108465
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6fcf9f606edc"
+down_revision = "7a5fe1bc504b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the tasks table built by db.create_all already has the new index only
+    index_names = {
+        index["name"] for index in sa.inspect(op.get_bind()).get_indexes("tasks")
+    }
+
+    if "ix_tasks_tasks_list_id_is_done" in index_names:
+        op.drop_index("ix_tasks_tasks_list_id_is_done", table_name="tasks")
+    if "ix_tasks_achievements" not in index_names:
+        op.create_index(
+            "ix_tasks_achievements",
+            "tasks",
+            ["tasks_list_id", "completed_at"],
+            postgresql_where=sa.text("is_done"),
+            sqlite_where=sa.text("is_done"),
+        )
+
+
+def downgrade():
+    op.drop_index("ix_tasks_achievements", table_name="tasks")
+    op.create_index(
+        "ix_tasks_tasks_list_id_is_done", "tasks", ["tasks_list_id", "is_done"]
+    )
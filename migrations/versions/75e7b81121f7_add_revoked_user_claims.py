@@ -0,0 +1,38 @@
+"""add revoked user claims
+
+Revision ID: 75e7b81121f7
+Revises: 9e9eb78b92c1
+Create Date: 2026-10-18 17:21:44.630912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "75e7b81121f7"
+down_revision = "9e9eb78b92c1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the table is already there when db.create_all built the database
+    if "revoked_user_claims" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "revoked_user_claims",
+        sa.Column("user_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("revoked_at", sa.Float(), nullable=False),
+        sa.Column("expires_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_revoked_user_claims_expires_at", "revoked_user_claims", ["expires_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_revoked_user_claims_expires_at", table_name="revoked_user_claims")
+    op.drop_table("revoked_user_claims")
@@ -0,0 +1,133 @@
+"""move tasks from the tasks_list json column to the tasks table
+
+Revision ID: 7a5fe1bc504b
+Revises: 4a36f35ec4dc
+Create Date: 2026-10-18 10:02:17.542871
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7a5fe1bc504b"
+down_revision = "4a36f35ec4dc"
+branch_labels = None
+depends_on = None
+
+
+tasks_list_table = sa.table(
+    "tasks_list", sa.column("id", sa.Integer), sa.column("tasks", sa.Text)
+)
+tasks_table = sa.table(
+    "tasks",
+    sa.column("tasks_list_id", sa.Integer),
+    sa.column("task_id", sa.Integer),
+    sa.column("description", sa.Text),
+    sa.column("is_done", sa.Boolean),
+    sa.column("created_at", sa.Float),
+    sa.column("completed_at", sa.Float),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if "tasks" not in inspector.get_table_names():
+        op.create_table(
+            "tasks",
+            sa.Column(
+                "tasks_list_id",
+                sa.Integer(),
+                sa.ForeignKey("tasks_list.id"),
+                nullable=False,
+            ),
+            sa.Column("task_id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("is_done", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.Float(), nullable=True),
+            sa.Column("completed_at", sa.Float(), nullable=True),
+            sa.PrimaryKeyConstraint("tasks_list_id", "task_id"),
+        )
+        op.create_index(
+            "ix_tasks_tasks_list_id_is_done", "tasks", ["tasks_list_id", "is_done"]
+        )
+        op.create_index("ix_tasks_completed_at", "tasks", ["completed_at"])
+
+    tasks_list_columns = [
+        column["name"] for column in inspector.get_columns("tasks_list")
+    ]
+    if "tasks" not in tasks_list_columns:
+        return
+
+    connection = op.get_bind()
+    rows = []
+    for tasks_list_id, tasks in connection.execute(
+        sa.select([tasks_list_table.c.id, tasks_list_table.c.tasks])
+    ):
+        try:
+            tasks = json.loads(tasks) if tasks else []
+        except ValueError:
+            tasks = []
+
+        # empty lists were stored as "{}"
+        if not isinstance(tasks, list):
+            continue
+
+        for task in tasks:
+            rows.append(
+                {
+                    "tasks_list_id": tasks_list_id,
+                    "task_id": task["id"],
+                    "description": task.get("description"),
+                    "is_done": bool(task.get("is_done")),
+                    "created_at": task.get("created_at"),
+                    "completed_at": task.get("completed_at"),
+                }
+            )
+
+    if rows:
+        op.bulk_insert(tasks_table, rows)
+
+    with op.batch_alter_table("tasks_list") as batch_op:
+        batch_op.drop_column("tasks")
+
+
+def downgrade():
+    with op.batch_alter_table("tasks_list") as batch_op:
+        batch_op.add_column(sa.Column("tasks", sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    tasks_by_list = {}
+    for row in connection.execute(
+        sa.select([tasks_table]).order_by(
+            tasks_table.c.tasks_list_id, tasks_table.c.task_id
+        )
+    ):
+        tasks_by_list.setdefault(row.tasks_list_id, []).append(
+            {
+                "id": row.task_id,
+                "description": row.description,
+                "is_done": row.is_done,
+                "created_at": row.created_at,
+                "completed_at": row.completed_at,
+            }
+        )
+
+    for tasks_list_id, tasks in tasks_by_list.items():
+        connection.execute(
+            tasks_list_table.update()
+            .where(tasks_list_table.c.id == tasks_list_id)
+            .values(tasks=json.dumps(tasks))
+        )
+    connection.execute(
+        tasks_list_table.update()
+        .where(tasks_list_table.c.tasks.is_(None))
+        .values(tasks=json.dumps([]))
+    )
+
+    op.drop_index("ix_tasks_completed_at", table_name="tasks")
+    op.drop_index("ix_tasks_tasks_list_id_is_done", table_name="tasks")
+    op.drop_table("tasks")
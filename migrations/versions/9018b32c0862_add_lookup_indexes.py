@@ -0,0 +1,70 @@
+"""add indexes on the lookup columns
+
+Revision ID: 9018b32c0862
+Revises: 2225b1490034
+Create Date: 2026-10-18 15:20:46.731902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9018b32c0862"
+down_revision = "2225b1490034"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    (
+        "ix_mentorship_relations_mentor_id_state",
+        "mentorship_relations",
+        ["mentor_id", "state"],
+    ),
+    (
+        "ix_mentorship_relations_mentee_id_state",
+        "mentorship_relations",
+        ["mentee_id", "state"],
+    ),
+    (
+        "ix_mentorship_relations_state_end_date",
+        "mentorship_relations",
+        ["state", "end_date"],
+    ),
+    (
+        "ix_mentorship_relations_tasks_list_id",
+        "mentorship_relations",
+        ["tasks_list_id"],
+    ),
+    (
+        "ix_tasks_comments_task_id_relation_id",
+        "tasks_comments",
+        ["task_id", "relation_id"],
+    ),
+    ("ix_tasks_comments_relation_id", "tasks_comments", ["relation_id"]),
+    ("ix_tasks_comments_user_id", "tasks_comments", ["user_id"]),
+    (
+        "ix_users_is_email_verified_registration_date",
+        "users",
+        ["is_email_verified", "registration_date"],
+    ),
+    ("ix_users_is_admin", "users", ["is_admin"]),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    table_names = inspector.get_table_names()
+
+    for index_name, table_name, columns in INDEXES:
+        # db.create_all creates the tables together with these indexes
+        if table_name not in table_names:
+            continue
+        if index_name in {index["name"] for index in inspector.get_indexes(table_name)}:
+            continue
+        op.create_index(index_name, table_name, columns)
+
+
+def downgrade():
+    for index_name, table_name, _ in reversed(INDEXES):
+        op.drop_index(index_name, table_name=table_name)
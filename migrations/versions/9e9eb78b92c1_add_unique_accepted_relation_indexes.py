@@ -0,0 +1,59 @@
+"""add unique partial indexes on the accepted relations
+
+Revision ID: 9e9eb78b92c1
+Revises: 9018b32c0862
+Create Date: 2026-10-18 15:57:03.482913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9e9eb78b92c1"
+down_revision = "9018b32c0862"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # db.create_all creates the table together with these indexes
+    if "mentorship_relations" not in inspector.get_table_names():
+        return
+    index_names = {
+        index["name"] for index in inspector.get_indexes("mentorship_relations")
+    }
+
+    for column in ("mentor_id", "mentee_id"):
+        if f"ux_mentorship_relations_accepted_{column}" in index_names:
+            continue
+        # the race these indexes close may have left users in several relations
+        duplicates = op.get_bind().execute(
+            f"SELECT {column}, COUNT(*) FROM mentorship_relations "
+            f"WHERE state = 'ACCEPTED' GROUP BY {column} HAVING COUNT(*) > 1"
+        )
+        duplicates = [f"{user_id} ({count})" for user_id, count in duplicates]
+        if duplicates:
+            raise RuntimeError(
+                f"Cannot add ux_mentorship_relations_accepted_{column}, these "
+                f"users are the {column[:-3]} of several ACCEPTED relations: "
+                f"{', '.join(duplicates)}. Cancel all but one relation of each "
+                "and upgrade again."
+            )
+        op.create_index(
+            f"ux_mentorship_relations_accepted_{column}",
+            "mentorship_relations",
+            [column],
+            unique=True,
+            postgresql_where=sa.text("state = 'ACCEPTED'"),
+            sqlite_where=sa.text("state = 'ACCEPTED'"),
+        )
+
+
+def downgrade():
+    for column in ("mentee_id", "mentor_id"):
+        op.drop_index(
+            f"ux_mentorship_relations_accepted_{column}",
+            table_name="mentorship_relations",
+        )
@@ -0,0 +1,68 @@
+"""add users active relation id
+
+Revision ID: c3f1a2d4e8b7
+Revises: 75e7b81121f7
+Create Date: 2026-10-18 19:04:12.527140
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3f1a2d4e8b7"
+down_revision = "75e7b81121f7"
+branch_labels = None
+depends_on = None
+
+ACCEPTED_RELATION_USERS = (
+    "SELECT id AS relation_id, mentor_id AS user_id FROM mentorship_relations "
+    "WHERE state = 'ACCEPTED' "
+    "UNION ALL "
+    "SELECT id AS relation_id, mentee_id AS user_id FROM mentorship_relations "
+    "WHERE state = 'ACCEPTED'"
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # db.create_all creates the column together with its index
+    if "users" not in inspector.get_table_names():
+        return
+    if "active_relation_id" in {
+        column["name"] for column in inspector.get_columns("users")
+    }:
+        return
+
+    has_relations = "mentorship_relations" in inspector.get_table_names()
+    if has_relations:
+        # a user can't be claimed by two relations, as mentor of one and
+        # mentee of the other for instance
+        duplicates = bind.execute(
+            f"SELECT user_id, COUNT(*) FROM ({ACCEPTED_RELATION_USERS}) AS accepted "
+            "GROUP BY user_id HAVING COUNT(*) > 1"
+        )
+        duplicates = [f"{user_id} ({count})" for user_id, count in duplicates]
+        if duplicates:
+            raise RuntimeError(
+                "Cannot add users.active_relation_id, these users are part of "
+                f"several ACCEPTED relations: {', '.join(duplicates)}. Cancel all "
+                "but one relation of each and upgrade again."
+            )
+
+    op.add_column("users", sa.Column("active_relation_id", sa.Integer()))
+    op.create_index("ix_users_active_relation_id", "users", ["active_relation_id"])
+
+    if has_relations:
+        op.execute(
+            "UPDATE users SET active_relation_id = ("
+            f"SELECT relation_id FROM ({ACCEPTED_RELATION_USERS}) AS accepted "
+            "WHERE accepted.user_id = users.id)"
+        )
+
+
+def downgrade():
+    op.drop_index("ix_users_active_relation_id", table_name="users")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("active_relation_id")
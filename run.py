@@ -24,13 +24,30 @@ def create_app(config_filename: str) -> Flask:
 
     api.init_app(app)
 
-    from app.api.mail_extension import mail
+    from app.api.mail_extension import mail, mail_pool
 
     mail.init_app(app)
+    mail_pool.init_app(app)
 
-    from app.schedulers.background_scheduler import init_schedulers
+    from app.api.confirmation_tokens import ConfirmationTokens
+    from app.api.email_templates import email_templates
 
-    init_schedulers()
+    ConfirmationTokens.init_app(app)
+    email_templates.init_app(app)
+
+    from app.schedulers.email_outbox_worker import email_outbox_worker
+
+    email_outbox_worker.init_app(app)
+
+    from app.api.cache_extension import cache
+    from app.database.cache_invalidation import init_cache_invalidation
+
+    cache.init_app(app)
+    init_cache_invalidation()
+
+    from app.schedulers.background_scheduler import scheduler_leader
+
+    scheduler_leader.init_app(app)
 
     return app
 
@@ -0,0 +1,6 @@
+import os
+
+# the app is built from these when run is imported by the tests
+os.environ.setdefault("FLASK_ENVIRONMENT_CONFIG", "test")
+os.environ.setdefault("SECRET_KEY", "TEST_SECRET_KEY")
+os.environ.setdefault("SECURITY_PASSWORD_SALT", "TEST_SECURITY_PWD_SALT")
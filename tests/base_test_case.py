@@ -0,0 +1,17 @@
+from flask_testing import TestCase
+
+from app.database.sqlalchemy_extension import db
+from run import application
+
+
+class BaseTestCase(TestCase):
+    @classmethod
+    def create_app(cls):
+        return application
+
+    def setUp(self):
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
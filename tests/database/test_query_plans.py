@@ -0,0 +1,184 @@
+"""
+Runs EXPLAIN on the queries of the DAO functions and fails when one of them
+reads a whole table instead of using an index. The plans are checked on the
+test database, SQLite unless TEST_DATABASE_URI gives a PostgreSQL one.
+"""
+import json
+import re
+import unittest
+
+from flask import g
+from sqlalchemy import event
+
+from app.api.dao.admin import AdminDAO
+from app.api.dao.mentorship_relation import MentorshipRelationDAO
+from app.api.dao.task import TaskDAO
+from app.api.dao.task_comment import TaskCommentDAO
+from app.api.dao.user import UserDAO
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.fixtures import add_relation_tasks, add_users
+
+# e.g. "SCAN users", "SCAN TABLE users" before SQLite 3.36, or with an alias
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+
+class TestQueryPlans(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        add_users(20)
+        add_relation_tasks()
+        relation = MentorshipRelationModel.query.order_by(
+            MentorshipRelationModel.id
+        ).first()
+        self.user_id = relation.mentee_id
+        self.relation_id = relation.id
+
+    def capture_selects(self, function, *args, **kwargs):
+        selects = []
+
+        def capture_select(conn, cursor, statement, parameters, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                selects.append((statement, parameters))
+
+        event.listen(db.engine, "before_cursor_execute", capture_select)
+        try:
+            function(*args, **kwargs)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture_select)
+
+        return selects
+
+    @staticmethod
+    def table_name(name: str) -> str:
+        # the aliases of a table are named after it, e.g. users_1
+        if name not in db.metadata.tables:
+            name = re.sub(r"_\d+$", "", name)
+        return name
+
+    def sqlite_scanned_tables(self, statement, parameters):
+        plan = db.session.connection().execute(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+        scanned_tables = set()
+        for row in plan:
+            match = SQLITE_SCAN.match(row[-1])
+            # virtual tables, i.e. the search table, are read through their index
+            if match and "VIRTUAL TABLE" not in row[-1]:
+                scanned_tables.add(self.table_name(match.group(1)))
+
+        return scanned_tables & set(db.metadata.tables)
+
+    def postgresql_scanned_tables(self, statement, parameters):
+        connection = db.session.connection()
+        # the tables of the test are tiny, so without this the planner would
+        # scan them even when an index can serve the query
+        connection.execute("SET LOCAL enable_seqscan = off")
+        plan = connection.execute(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        scanned_tables = set()
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan":
+                scanned_tables.add(self.table_name(node["Relation Name"]))
+            nodes.extend(node.get("Plans", []))
+
+        return scanned_tables
+
+    def assert_no_table_scan(self, function, *args, allowed_tables=(), **kwargs):
+        dialect = db.engine.dialect.name
+        if dialect == "sqlite":
+            scanned_tables = self.sqlite_scanned_tables
+        elif dialect == "postgresql":
+            scanned_tables = self.postgresql_scanned_tables
+        else:
+            self.skipTest(f"EXPLAIN isn't checked on {dialect}")
+
+        # the first call looks up the search backend of the database
+        function(*args, **kwargs)
+        # and loads the user for the rest of the request
+        g.pop("request_users", None)
+        selects = self.capture_selects(function, *args, **kwargs)
+        self.assertTrue(selects)
+        for statement, parameters in selects:
+            tables = scanned_tables(statement, parameters) - set(allowed_tables)
+            self.assertFalse(
+                tables,
+                f"The query scans {', '.join(sorted(tables))}:\n{statement}",
+            )
+
+    def test_list_users(self):
+        # every user is listed, and counted for the pagination
+        self.assert_no_table_scan(
+            UserDAO.list_users, self.user_id, allowed_tables={"users"}
+        )
+
+    def test_list_users_by_cursor(self):
+        self.assert_no_table_scan(UserDAO.list_users_by_cursor, self.user_id)
+
+    def test_list_verified_users(self):
+        self.assert_no_table_scan(UserDAO.list_users, self.user_id, is_verified=True)
+
+    def test_search_users(self):
+        self.assert_no_table_scan(UserDAO.list_users, self.user_id, "user1")
+
+    def test_get_user(self):
+        self.assert_no_table_scan(UserDAO.get_user, self.user_id)
+
+    def test_get_user_statistics(self):
+        self.assert_no_table_scan(UserDAO.get_user_statistics, self.user_id)
+
+    def test_get_user_dashboard(self):
+        self.assert_no_table_scan(UserDAO.get_user_dashboard, self.user_id)
+
+    def test_get_achievements(self):
+        self.assert_no_table_scan(UserDAO.get_achievements, self.user_id)
+
+    def test_list_admins(self):
+        self.assert_no_table_scan(AdminDAO.list_admins, self.user_id)
+
+    def test_list_mentorship_relations(self):
+        self.assert_no_table_scan(
+            MentorshipRelationDAO.list_mentorship_relations, user_id=self.user_id
+        )
+
+    def test_list_past_mentorship_relations(self):
+        self.assert_no_table_scan(
+            MentorshipRelationDAO.list_past_mentorship_relations, self.user_id
+        )
+
+    def test_list_current_mentorship_relation(self):
+        self.assert_no_table_scan(
+            MentorshipRelationDAO.list_current_mentorship_relation, self.user_id
+        )
+
+    def test_list_pending_mentorship_relations(self):
+        self.assert_no_table_scan(
+            MentorshipRelationDAO.list_pending_mentorship_relations, self.user_id
+        )
+
+    def test_list_tasks(self):
+        self.assert_no_table_scan(TaskDAO.list_tasks, self.user_id, self.relation_id)
+
+    def test_get_all_task_comments_by_task_id(self):
+        self.assert_no_table_scan(
+            TaskCommentDAO.get_all_task_comments_by_task_id,
+            self.user_id,
+            1,
+            self.relation_id,
+        )
+
+    def test_get_all_task_comments_by_user_id(self):
+        self.assert_no_table_scan(
+            TaskCommentDAO.get_all_task_comments_by_user_id, self.user_id
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
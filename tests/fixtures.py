@@ -0,0 +1,74 @@
+import time
+
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.task_comment import TaskCommentModel
+from app.database.models.tasks_list import TasksListModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import MentorshipRelationState
+
+
+def add_users(count: int) -> list:
+    """Adds verified users, half of them in accepted relations, returns their ids."""
+
+    now = time.time()
+    # one password hash for all of them, hashing is slow on purpose
+    user = UserModel("User", "user", "Passw0rd!", "user@example.com", True)
+    db.session.execute(
+        UserModel.__table__.insert(),
+        [
+            {
+                "name": f"User {index}",
+                "username": f"user{index}",
+                "email": f"user{index}@example.com",
+                "password_hash": user.password_hash,
+                "registration_date": now,
+                "terms_and_conditions_checked": True,
+                "is_admin": False,
+                "is_email_verified": True,
+                "need_mentoring": True,
+                "available_to_mentor": True,
+            }
+            for index in range(count)
+        ],
+    )
+    user_ids = [user.id for user in UserModel.query.with_entities(UserModel.id)]
+    db.session.execute(
+        MentorshipRelationModel.__table__.insert(),
+        [
+            {
+                "mentor_id": mentor_id,
+                "mentee_id": mentee_id,
+                "action_user_id": mentor_id,
+                "creation_date": now,
+                "accept_date": now,
+                "start_date": now,
+                "end_date": now + 86400,
+                "state": MentorshipRelationState.ACCEPTED,
+                "notes": "",
+            }
+            for mentor_id, mentee_id in zip(user_ids[1::4], user_ids[2::4])
+        ],
+    )
+    for relation in MentorshipRelationModel.query:
+        UserModel.query.filter(
+            UserModel.id.in_((relation.mentor_id, relation.mentee_id))
+        ).update({UserModel.active_relation_id: relation.id}, synchronize_session=False)
+    db.session.commit()
+    return user_ids
+
+
+def add_relation_tasks() -> None:
+    """Adds a pending and a done task to the relations, with a comment each."""
+
+    now = time.time()
+    for relation in MentorshipRelationModel.query:
+        relation.tasks_list = TasksListModel()
+        relation.tasks_list.add_task("Task", now)
+        relation.tasks_list.add_task("Done task", now, True, now)
+        db.session.flush()
+        for task_id in (1, 2):
+            db.session.add(
+                TaskCommentModel(relation.mentee_id, task_id, relation.id, "Comment")
+            )
+    db.session.commit()
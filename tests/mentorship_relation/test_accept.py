@@ -0,0 +1,92 @@
+import time
+import unittest
+
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.tasks_list import TasksListModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import MentorshipRelationState
+from tests.base_test_case import BaseTestCase
+
+
+class TestAcceptMentorshipRelation(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.users = []
+        for index in range(3):
+            user = UserModel(
+                f"User {index}",
+                f"user{index}",
+                "Passw0rd!",
+                f"user{index}@example.com",
+                True,
+            )
+            user.is_email_verified = True
+            db.session.add(user)
+            self.users.append(user)
+        db.session.commit()
+
+    def add_relation(self, mentor, mentee, state=MentorshipRelationState.PENDING):
+        now = time.time()
+        relation = MentorshipRelationModel(
+            mentor.id, mentor, mentee, now, now + 86400, state, "", TasksListModel()
+        )
+        relation.save_to_db()
+        return relation
+
+    def test_accept_claims_the_mentor_and_the_mentee(self):
+        relation = self.add_relation(self.users[0], self.users[1])
+
+        self.assertTrue(relation.accept())
+
+        self.assertEqual(MentorshipRelationState.ACCEPTED, relation.state)
+        self.assertEqual(relation.id, self.users[0].active_relation_id)
+        self.assertEqual(relation.id, self.users[1].active_relation_id)
+        self.assertIsNone(self.users[2].active_relation_id)
+
+    def test_accept_refuses_a_user_accepted_in_another_role(self):
+        self.assertTrue(self.add_relation(self.users[0], self.users[1]).accept())
+        # the mentor of the accepted relation would become a mentee
+        relation = self.add_relation(self.users[2], self.users[0])
+
+        self.assertFalse(relation.accept())
+
+        self.assertEqual(MentorshipRelationState.PENDING, relation.state)
+        self.assertIsNone(self.users[2].active_relation_id)
+
+    def test_accept_rolls_back_when_the_unique_indexes_refuse_it(self):
+        # an ACCEPTED relation which did not claim its users, as one left by
+        # the race before the users had an active relation
+        self.add_relation(
+            self.users[0], self.users[1], MentorshipRelationState.ACCEPTED
+        )
+        relation = self.add_relation(self.users[0], self.users[2])
+
+        self.assertFalse(relation.accept())
+
+        self.assertEqual(MentorshipRelationState.PENDING, relation.state)
+        self.assertIsNone(self.users[0].active_relation_id)
+        self.assertIsNone(self.users[2].active_relation_id)
+
+    def test_cancelled_and_completed_relations_release_their_users(self):
+        from app.api.dao.mentorship_relation import MentorshipRelationDAO
+        from app.schedulers.complete_mentorship_cron_job import (
+            complete_overdue_mentorship_relations,
+        )
+
+        relation = self.add_relation(self.users[0], self.users[1])
+        self.assertTrue(relation.accept())
+        MentorshipRelationDAO.cancel_relation(self.users[0].id, relation.id)
+        self.assertIsNone(self.users[0].active_relation_id)
+        self.assertIsNone(self.users[1].active_relation_id)
+
+        relation = self.add_relation(self.users[1], self.users[0])
+        self.assertTrue(relation.accept())
+        complete_overdue_mentorship_relations(relation.end_date + 1, 10)
+        self.assertIsNone(self.users[0].active_relation_id)
+        self.assertIsNone(self.users[1].active_relation_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import time
+import unittest
+
+from app.api.email_utils import send_email
+from app.database.models.email_outbox import EmailOutboxModel
+from app.database.sqlalchemy_extension import db
+from app.schedulers.email_outbox_worker import drain_email_outbox, email_outbox_worker
+from app.utils.enum_utils import EmailOutboxState
+from tests.base_test_case import BaseTestCase
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30
+CLAIM_TIMEOUT = 300
+
+
+class TestEmailOutbox(BaseTestCase):
+    def add_email(self, **values):
+        email = EmailOutboxModel("user@example.com", "Subject", "<p>Hello</p>")
+        for name, value in values.items():
+            setattr(email, name, value)
+        db.session.add(email)
+        db.session.commit()
+        return email.id
+
+    def claim_batch(self, batch_size=10):
+        return EmailOutboxModel.claim_batch(batch_size, CLAIM_TIMEOUT, MAX_ATTEMPTS)
+
+    def test_send_email_is_queued_with_the_caller_transaction(self):
+        wake_up = email_outbox_worker._wake_up
+        wake_up.clear()
+
+        send_email("user@example.com", "Subject", "<p>Hello</p>")
+        self.assertFalse(wake_up.is_set())
+        db.session.rollback()
+        self.assertEqual(0, EmailOutboxModel.query.count())
+
+        send_email("user@example.com", "Subject", "<p>Hello</p>")
+        db.session.commit()
+        self.assertEqual(1, EmailOutboxModel.query.count())
+        self.assertTrue(wake_up.is_set())
+        wake_up.clear()
+
+    def test_claim_batch_claims_the_due_emails_once(self):
+        due_ids = [self.add_email() for _ in range(3)]
+        self.add_email(next_attempt_at=time.time() + 60)
+
+        first_batch = self.claim_batch(batch_size=2)
+        second_batch = self.claim_batch()
+
+        self.assertEqual(due_ids[:2], [email.id for email in first_batch])
+        self.assertEqual(due_ids[2:], [email.id for email in second_batch])
+        self.assertEqual([], self.claim_batch())
+        for email in first_batch + second_batch:
+            self.assertEqual(EmailOutboxState.SENDING, email.state)
+
+    def test_failed_email_is_retried_with_backoff_until_dead(self):
+        self.add_email()
+        (email,) = self.claim_batch()
+
+        for attempts in range(1, MAX_ATTEMPTS):
+            before = time.time()
+            email.mark_failed("Connection refused", MAX_ATTEMPTS, RETRY_DELAY)
+            db.session.commit()
+
+            self.assertEqual(EmailOutboxState.PENDING, email.state)
+            self.assertEqual(attempts, email.attempts)
+            self.assertGreaterEqual(
+                email.next_attempt_at, before + RETRY_DELAY * 2 ** (attempts - 1)
+            )
+            # due again once the backoff has passed
+            email.next_attempt_at = before
+            db.session.commit()
+            (email,) = self.claim_batch()
+
+        email.mark_failed("Connection refused", MAX_ATTEMPTS, RETRY_DELAY)
+        db.session.commit()
+
+        self.assertEqual(EmailOutboxState.DEAD, email.state)
+        self.assertEqual(MAX_ATTEMPTS, email.attempts)
+        self.assertEqual("Connection refused", email.last_error)
+        self.assertEqual([], self.claim_batch())
+
+    def test_stale_claims_count_as_attempts(self):
+        stale_claimed_at = time.time() - CLAIM_TIMEOUT - 1
+        email_id = self.add_email(
+            state=EmailOutboxState.SENDING,
+            claimed_by="lost",
+            claimed_at=stale_claimed_at,
+        )
+        dead_id = self.add_email(
+            state=EmailOutboxState.SENDING,
+            attempts=MAX_ATTEMPTS - 1,
+            claimed_by="lost",
+            claimed_at=stale_claimed_at,
+        )
+
+        (email,) = self.claim_batch()
+
+        self.assertEqual(email_id, email.id)
+        self.assertEqual(1, email.attempts)
+        dead_email = EmailOutboxModel.query.get(dead_id)
+        self.assertEqual(EmailOutboxState.DEAD, dead_email.state)
+        self.assertEqual(MAX_ATTEMPTS, dead_email.attempts)
+        self.assertEqual(EmailOutboxModel.CLAIM_TIMED_OUT, dead_email.last_error)
+
+    def test_drain_email_outbox_marks_the_emails_sent(self):
+        email_id = self.add_email()
+
+        self.assertEqual(1, drain_email_outbox(self.app))
+
+        email = EmailOutboxModel.query.get(email_id)
+        self.assertEqual(EmailOutboxState.SENT, email.state)
+        self.assertIsNone(email.claimed_by)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from app.database.models.scheduler_lease import SchedulerLeaseModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+
+LEASE_NAME = "background_scheduler"
+DURATION = 60
+
+
+class TestSchedulerLease(BaseTestCase):
+    def expire_lease(self):
+        SchedulerLeaseModel.query.filter_by(name=LEASE_NAME).update(
+            {SchedulerLeaseModel.expires_at: 0}
+        )
+        db.session.commit()
+
+    def lease(self):
+        return SchedulerLeaseModel.query.filter_by(name=LEASE_NAME).one()
+
+    def test_free_lease_is_taken(self):
+        self.assertTrue(SchedulerLeaseModel.acquire(LEASE_NAME, "first", DURATION))
+        self.assertEqual("first", self.lease().holder)
+
+    def test_lease_is_renewed_by_its_holder(self):
+        SchedulerLeaseModel.acquire(LEASE_NAME, "first", DURATION)
+        expires_at = self.lease().expires_at
+
+        self.assertTrue(SchedulerLeaseModel.acquire(LEASE_NAME, "first", DURATION))
+        self.assertGreaterEqual(self.lease().expires_at, expires_at)
+
+    def test_held_lease_is_not_taken_over(self):
+        SchedulerLeaseModel.acquire(LEASE_NAME, "first", DURATION)
+
+        self.assertFalse(SchedulerLeaseModel.acquire(LEASE_NAME, "second", DURATION))
+        self.assertEqual("first", self.lease().holder)
+
+    def test_expired_lease_is_taken_over(self):
+        SchedulerLeaseModel.acquire(LEASE_NAME, "first", DURATION)
+        self.expire_lease()
+
+        self.assertTrue(SchedulerLeaseModel.acquire(LEASE_NAME, "second", DURATION))
+        self.assertEqual("second", self.lease().holder)
+        self.assertFalse(SchedulerLeaseModel.acquire(LEASE_NAME, "first", DURATION))
+
+    def test_released_lease_is_taken(self):
+        SchedulerLeaseModel.acquire(LEASE_NAME, "first", DURATION)
+        SchedulerLeaseModel.release(LEASE_NAME, "first")
+
+        self.assertTrue(SchedulerLeaseModel.acquire(LEASE_NAME, "second", DURATION))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from sqlalchemy import event
+
+from app.api.dao.user import UserDAO
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.fixtures import add_users
+
+
+class TestListUsersQueryCount(BaseTestCase):
+    """
+    Benchmark of the SQL statements run per page of users, which has to stay
+    the same whatever the number of users on the page and their relations.
+    """
+
+    def count_statements(self, function, *args, **kwargs):
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count_statement)
+
+        return result, len(statements)
+
+    def assert_statements_per_page(self, expected_count, function, **kwargs):
+        # the first call looks up the search backend of the database
+        function(**kwargs, per_page=1)
+
+        for per_page in (1, 10, UserDAO.MAX_USERS_PER_PAGE):
+            result, count = self.count_statements(function, **kwargs, per_page=per_page)
+            self.assertEqual(per_page, len(result[0]))
+            self.assertEqual(
+                expected_count,
+                count,
+                f"{function.__name__} ran {count} statements for {per_page} users",
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.user_ids = add_users(UserDAO.MAX_USERS_PER_PAGE + 10)
+
+    def test_list_users_statements_per_page(self):
+        # the page of users and the total count of the pagination
+        self.assert_statements_per_page(2, UserDAO.list_users, user_id=self.user_ids[0])
+
+    def test_list_users_by_cursor_statements_per_page(self):
+        self.assert_statements_per_page(
+            1, UserDAO.list_users_by_cursor, user_id=self.user_ids[0]
+        )
+
+    def test_search_users_statements_per_page(self):
+        self.assert_statements_per_page(
+            2, UserDAO.list_users, user_id=self.user_ids[0], search_query="user"
+        )
+
+    def test_list_users_availability(self):
+        users, _ = UserDAO.list_users(
+            self.user_ids[0], per_page=UserDAO.MAX_USERS_PER_PAGE
+        )
+        in_relation = set()
+        for relation in MentorshipRelationModel.query:
+            in_relation.update((relation.mentor_id, relation.mentee_id))
+
+        for user in users:
+            self.assertEqual(user["id"] not in in_relation, user["is_available"])
+
+
+if __name__ == "__main__":
+    unittest.main()
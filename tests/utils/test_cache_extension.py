@@ -0,0 +1,40 @@
+import unittest
+
+from app.api.cache_extension import MemoryCacheBackend, UserCache
+
+
+class TestUserCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = UserCache()
+        self.cache.backend = MemoryCacheBackend(100)
+        self.cache.ttl = 60
+        self.builds = []
+
+    def build_statistics(self, user_id, invalidate=False):
+        self.builds.append(user_id)
+        if invalidate:
+            # a commit changing the user lands while the response is built
+            self.cache.invalidate_users([user_id])
+        return {"pending_requests": len(self.builds)}
+
+    def test_response_is_cached_until_invalidated(self):
+        get_statistics = self.cache.cached("statistics")(self.build_statistics)
+
+        self.assertEqual(get_statistics(1), get_statistics(1))
+        self.assertEqual([1], self.builds)
+
+        self.cache.invalidate_users([1])
+        get_statistics(1)
+        self.assertEqual([1, 1], self.builds)
+
+    def test_response_built_across_an_invalidation_is_not_cached(self):
+        get_statistics = self.cache.cached("statistics")(self.build_statistics)
+
+        get_statistics(1, invalidate=True)
+        get_statistics(1)
+
+        self.assertEqual([1, 1], self.builds)
+
+
+if __name__ == "__main__":
+    unittest.main()
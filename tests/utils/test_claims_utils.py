@@ -0,0 +1,56 @@
+import unittest
+
+from flask_jwt_extended import create_access_token, verify_jwt_in_request
+
+from app.database.models.user import UserModel
+from app.utils.claims_utils import revoke_user_claims
+from app.utils.decorator_utils import (
+    email_verification_required,
+    email_verified_cache,
+    is_admin_user,
+)
+from tests.base_test_case import BaseTestCase
+
+
+class TestTokenClaims(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.admin = UserModel("Admin", "admin", "Passw0rd!", "admin@example.com", True)
+        self.admin.is_email_verified = True
+        self.admin.save_to_db()
+        self.addCleanup(email_verified_cache.delete_many, [self.admin.id])
+        self.token = create_access_token(identity=self.admin.id)
+
+    def request_context(self):
+        context = self.app.test_request_context(
+            headers={"Authorization": f"Bearer {self.token}"}
+        )
+        context.push()
+        self.addCleanup(context.pop)
+        verify_jwt_in_request()
+
+    def test_email_verified_claim_is_trusted(self):
+        self.request_context()
+        # the claim is enough, the user row is not read again
+        UserModel.query.filter_by(id=self.admin.id).update({"is_email_verified": False})
+
+        self.assertEqual(
+            "called",
+            email_verification_required(lambda user_id: "called")(self.admin.id),
+        )
+
+    def test_admin_claim_is_trusted_until_revoked(self):
+        self.request_context()
+        self.assertTrue(is_admin_user(self.admin.id))
+
+        self.admin.is_admin = False
+        self.admin.save_to_db()
+        self.assertTrue(is_admin_user(self.admin.id))
+
+        revoke_user_claims(self.admin.id)
+        self.assertFalse(is_admin_user(self.admin.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
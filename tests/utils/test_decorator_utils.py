@@ -0,0 +1,53 @@
+import unittest
+
+from flask import g
+
+from app.api.dao.user import UserDAO
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from app.utils.decorator_utils import email_verified_cache, invalidate_request_user
+from tests.base_test_case import BaseTestCase
+
+
+class TestEmailVerificationRequired(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.user = UserModel("User", "user", "Passw0rd!", "user@example.com", True)
+        self.user.is_email_verified = True
+        self.user.save_to_db()
+        self.user_id = self.user.id
+        self.addCleanup(email_verified_cache.delete_many, [self.user_id])
+
+    def test_verified_user_is_cached_across_requests(self):
+        self.assertEqual(self.user, UserDAO.get_user(self.user_id))
+
+        self.assertTrue(email_verified_cache.get(self.user_id))
+
+    def test_invalidating_the_user_drops_the_cache_entry(self):
+        UserDAO.get_user(self.user_id)
+
+        invalidate_request_user(self.user_id)
+
+        self.assertIsNone(email_verified_cache.get(self.user_id))
+
+    def test_cached_user_deleted_elsewhere_does_not_exist(self):
+        UserDAO.get_user(self.user_id)
+        # deleted by another process, this one still has it cached
+        UserModel.query.filter_by(id=self.user_id).delete()
+        db.session.commit()
+        g.pop("request_users", None)
+
+        for call in (
+            lambda: UserDAO.get_user(self.user_id),
+            lambda: UserDAO.delete_user(self.user_id),
+            lambda: UserDAO.update_user_profile(self.user_id, {"name": "Name"}),
+            lambda: UserDAO.change_password(
+                self.user_id, {"current_password": "a", "new_password": "b"}
+            ),
+        ):
+            self.assertEqual(404, call()[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
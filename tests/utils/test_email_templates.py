@@ -0,0 +1,74 @@
+import logging
+import time
+import unittest
+
+from flask import render_template
+
+import config
+from app.api.api_extension import api
+from app.api.email_templates import email_templates
+from app.api.email_utils import generate_confirmation_token
+from app.api.resources.user import UserEmailConfirmation
+from tests.base_test_case import BaseTestCase
+
+logger = logging.getLogger(__name__)
+
+EMAIL_COUNT = 10000
+
+
+def render_with_flask(user_name, token):
+    confirm_url = api.url_for(UserEmailConfirmation, token=token, _external=True)
+    return render_template(
+        "email_confirmation.html",
+        confirm_url=confirm_url,
+        user_name=user_name,
+        threshold=config.BaseConfig.UNVERIFIED_USER_THRESHOLD,
+    )
+
+
+def render_compiled(user_name, token):
+    return email_templates.render(
+        "email_confirmation.html",
+        confirm_url=email_templates.confirm_url(token),
+        user_name=user_name,
+        threshold=config.BaseConfig.UNVERIFIED_USER_THRESHOLD,
+    )
+
+
+class TestEmailTemplatesBenchmark(BaseTestCase):
+    """
+    Benchmark of the rendering of 10k verification emails, by
+    flask.render_template and url_for before and by the compiled template and
+    confirmation url format after. Both have to output the same.
+    """
+
+    def test_verification_emails(self):
+        with self.app.test_request_context():
+            emails = [
+                (
+                    f"User {index}",
+                    generate_confirmation_token(f"user{index}@example.com"),
+                )
+                for index in range(EMAIL_COUNT)
+            ]
+
+            started_at = time.perf_counter()
+            flask_emails = [render_with_flask(*email) for email in emails]
+            flask_time = time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            compiled_emails = [render_compiled(*email) for email in emails]
+            compiled_time = time.perf_counter() - started_at
+
+        self.assertEqual(flask_emails, compiled_emails)
+        logger.info(
+            "%d verification emails: %.3f s with render_template and url_for, "
+            "%.3f s compiled",
+            EMAIL_COUNT,
+            flask_time,
+            compiled_time,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from flask_mail import Message
+
+from app.api.mail_extension import mail_pool
+from tests.base_test_case import BaseTestCase
+
+
+class TestMailConnectionPool(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        mail_pool._idle_connections.clear()
+
+    def message(self, subject="Subject", sender="sender@example.com"):
+        return Message(
+            subject, recipients=["user@example.com"], html="<p>Hi</p>", sender=sender
+        )
+
+    def test_send_many_reports_the_error_of_each_message(self):
+        messages = [
+            self.message(),
+            self.message(sender=None),
+            self.message(subject="Subject\nBcc: user@example.org"),
+            self.message(),
+        ]
+
+        errors = mail_pool.send_many(messages)
+
+        self.assertIsNone(errors[0])
+        self.assertIsNotNone(errors[1])
+        self.assertIsNotNone(errors[2])
+        self.assertIsNone(errors[3])
+        # the connection went back to the pool
+        self.assertEqual(1, len(mail_pool._idle_connections))
+
+
+if __name__ == "__main__":
+    unittest.main()
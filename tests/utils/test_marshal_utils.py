@@ -0,0 +1,87 @@
+import logging
+import time
+import timeit
+import unittest
+
+from flask_restx import marshal
+
+from app.api.dao.mentorship_relation import MentorshipRelationDAO
+from app.api.dao.user import UserDAO
+from app.api.models.mentorship_relation import mentorship_request_response_body
+from app.api.models.user import public_user_api_model
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import MentorshipRelationState
+from app.utils.marshal_utils import compile_model
+from tests.base_test_case import BaseTestCase
+from tests.fixtures import add_users
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50
+
+
+class TestCompiledModelBenchmark(BaseTestCase):
+    """
+    Benchmark of the serialization of 50 rows pages, by flask-restx marshal
+    before and by the compiled models after. Both have to output the same.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user_ids = add_users(PAGE_SIZE + 10)
+
+        # relation requests of the first user with all the others
+        now = time.time()
+        db.session.execute(
+            MentorshipRelationModel.__table__.insert(),
+            [
+                {
+                    "mentor_id": self.user_ids[0],
+                    "mentee_id": mentee_id,
+                    "action_user_id": mentee_id,
+                    "creation_date": now,
+                    "end_date": now + 86400,
+                    "state": MentorshipRelationState.PENDING,
+                    "notes": "Notes",
+                }
+                for mentee_id in self.user_ids[1:]
+            ],
+        )
+        db.session.commit()
+
+    def assert_compiled_model_outputs_the_same(self, model, page):
+        self.assertEqual(PAGE_SIZE, len(page))
+
+        serialize = compile_model(model)
+        self.assertEqual(marshal(page, model), [serialize(row) for row in page])
+
+        restx_time = min(timeit.repeat(lambda: marshal(page, model), number=20))
+        compiled_time = min(
+            timeit.repeat(lambda: [serialize(row) for row in page], number=20)
+        )
+        logger.info(
+            "%s: %.3f ms with marshal, %.3f ms compiled per %d rows",
+            model.name,
+            restx_time / 20 * 1000,
+            compiled_time / 20 * 1000,
+            PAGE_SIZE,
+        )
+
+    def test_users_page(self):
+        users, _ = UserDAO.list_users(self.user_ids[-1], per_page=PAGE_SIZE)
+
+        self.assert_compiled_model_outputs_the_same(public_user_api_model, users)
+
+    def test_relations_page(self):
+        relations, _, _ = MentorshipRelationDAO.list_mentorship_relations(
+            user_id=self.user_ids[0], limit=PAGE_SIZE
+        )
+
+        self.assert_compiled_model_outputs_the_same(
+            mentorship_request_response_body, relations
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()